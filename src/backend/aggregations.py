@@ -0,0 +1,185 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q, Sum, Avg, Max, Min, Count
+from django.db.models.functions import ExtractMonth, TruncMonth
+
+from .middleware import current_query_timer
+from .models import Category, YearlyRollup
+from .search import search_queryset
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def parse_filters(params):
+    """
+    Parse the filter set shared by the summary endpoints and the dashboard.
+    Raises ValueError on malformed dates.
+    """
+    start_date = params.get('start_date')
+    end_date = params.get('end_date')
+    category = params.get('category')
+    return {
+        'start_date': datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+        'end_date': datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None,
+        'category': category if category and category != 'all' else None,
+        'search': params.get('search') or None,
+        'year': int(params.get('year') or datetime.now().year),
+    }
+
+
+def apply_filters(queryset, filters, dates=True):
+    if dates and filters['start_date']:
+        queryset = queryset.filter(date__gte=filters['start_date'])
+    if dates and filters['end_date']:
+        queryset = queryset.filter(date__lte=filters['end_date'])
+    if filters['category']:
+        queryset = queryset.filter(category__name=filters['category'])
+    if filters['search']:
+        queryset = search_queryset(queryset, filters['search'])
+    return queryset
+
+
+def archived_rollups(user, filters, dates=True):
+    """
+    The user's archived month x category totals matching the filters. Archived
+    history resolves to whole months, and can't be searched by description.
+    """
+    if filters['search']:
+        return YearlyRollup.objects.none()
+    rollups = YearlyRollup.objects.filter(user=user)
+    start_date, end_date = filters['start_date'], filters['end_date']
+    if dates and start_date:
+        rollups = rollups.filter(Q(year__gt=start_date.year) | Q(year=start_date.year, month__gte=start_date.month))
+    if dates and end_date:
+        rollups = rollups.filter(Q(year__lt=end_date.year) | Q(year=end_date.year, month__lte=end_date.month))
+    if filters['category']:
+        rollups = rollups.filter(category=filters['category'])
+    return rollups
+
+
+def expense_summary(user, queryset):
+    """
+    Spending statistics and per-category totals of the given expenses.
+    """
+    stats = queryset.aggregate(
+        total=Sum('amount'),
+        avg=Avg('amount'),
+        max=Max('amount'),
+        min=Min('amount'),
+        count=Count('id')
+    )
+
+    # One grouped query instead of one aggregate per category
+    totals = dict(queryset.values_list('category').annotate(total=Sum('amount')).order_by())
+    categories = [
+        {'name': category.name, 'amount': totals.get(category.pk) or 0}
+        for category in Category.objects.filter(user=user)
+    ]
+    categories.sort(key=lambda x: x['amount'], reverse=True)
+
+    return {
+        'total_spending': stats['total'] or 0,
+        'avg_transaction': stats['avg'] or 0,
+        'max_expense': stats['max'] or 0,
+        'min_expense': stats['min'] or 0,
+        'transaction_count': stats['count'] or 0,
+        'categories_used': len(totals),
+        'spending_by_category': categories
+    }
+
+
+def expense_monthly_summary(queryset):
+    """
+    Monthly expense totals, oldest month first.
+    """
+    months = queryset.annotate(month=TruncMonth('date')).values('month').annotate(
+        amount=Sum('amount')
+    ).order_by('month')
+    return [{'month': row['month'].strftime('%b %Y'), 'amount': float(row['amount'])} for row in months]
+
+
+def spending_by_category(queryset, rollups=None):
+    """
+    Transaction totals grouped by category, largest first, including the
+    archived totals in `rollups` when given.
+    """
+    category_summary = list(queryset.values('category__name').annotate(
+        total=Sum('amount')
+    ).order_by('-total'))
+    total_spending = queryset.aggregate(total=Sum('amount'))['total'] or 0
+
+    if rollups is not None:
+        archived = dict(rollups.values_list('category').annotate(total=Sum('total')).order_by())
+        if archived:
+            totals = {row['category__name']: row['total'] for row in category_summary}
+            for category, total in archived.items():
+                totals[category] = (totals.get(category) or 0) + total
+            category_summary = sorted(
+                ({'category__name': category, 'total': total} for category, total in totals.items()),
+                key=lambda row: row['total'], reverse=True
+            )
+            total_spending += sum(archived.values())
+
+    return {
+        'categories': category_summary,
+        'total_spending': total_spending
+    }
+
+
+def spending_by_month(queryset, year, rollups=None):
+    """
+    Transaction totals for every month of the given year, keyed by month name,
+    including the archived totals in `rollups` when given.
+    """
+    totals = dict(queryset.filter(date__year=year).annotate(month=ExtractMonth('date')).values_list(
+        'month').annotate(total=Sum('amount')).order_by())
+    if rollups is not None:
+        archived = rollups.filter(year=year).values_list('month').annotate(total=Sum('total')).order_by()
+        for month, total in archived:
+            totals[month] = (totals.get(month) or 0) + total
+    return {
+        datetime(2000, month, 1).strftime('%B'): totals.get(month) or 0
+        for month in range(1, 13)
+    }
+
+
+def _run_section(function):
+    timer = current_query_timer.get()
+    try:
+        with ExitStack() as stack:
+            # Count the section's queries into the request's instrumentation
+            if timer is not None:
+                timer.install(stack)
+            return function()
+    finally:
+        # Pool threads hold their own connections; release them like a request would
+        close_old_connections()
+
+
+def run_concurrently(sections):
+    """
+    Compute independent sections (name -> zero-argument callable) on a shared
+    thread pool, each on its own database connection. With DASHBOARD_WORKERS
+    set to 1 or less the sections run one after another in the calling thread.
+    """
+    global _executor
+    workers = getattr(settings, 'DASHBOARD_WORKERS', 4)
+    if workers <= 1:
+        return {name: function() for name, function in sections.items()}
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard')
+    # copy_context keeps per-request state such as replica routing and the query timer in the worker threads
+    futures = {
+        name: _executor.submit(contextvars.copy_context().run, _run_section, function)
+        for name, function in sections.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,141 @@
+from django.conf import settings
+
+from .db_router import reading_from_replica
+from .models import Transaction
+from .versions import VersionedCache
+
+FRAME_COLUMNS = ['date', 'amount', 'description', 'category']
+
+
+def normalize_merchant(descriptions):
+    """
+    Reduce raw statement descriptions to a merchant key: lower case, letters only,
+    first two words. Works on a whole pandas Series at once.
+    """
+    words = descriptions.str.lower().str.replace(r'[^a-z ]+', ' ', regex=True).str.split()
+    return words.str[:2].str.join(' ')
+
+
+def load_transaction_frame(user_id):
+    """
+    Load a user's transactions into a compact columnar DataFrame.
+    """
+    import pandas as pd
+
+    rows = Transaction.objects.filter(user_id=user_id).values_list(
+        'date', 'amount', 'description', 'category__name'
+    )
+    frame = pd.DataFrame.from_records(list(rows.iterator()), columns=FRAME_COLUMNS)
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame['amount'] = frame['amount'].astype('float64')
+    frame['category'] = frame['category'].fillna('Unknown').astype('category')
+    frame['merchant'] = normalize_merchant(frame['description'].astype(str)).astype('category')
+    frame = frame.drop(columns='description')
+    return frame.sort_values('date', ignore_index=True)
+
+
+class FrameCache(VersionedCache):
+    """
+    Per-worker LRU of user transaction frames, each tagged with the data version
+    it was built from. A frame is reused only while the user's version is unchanged.
+
+    Frames are only cached when read from the primary: a lagging replica may
+    not hold the writes the current version counts yet.
+    """
+
+    def __init__(self, maxsize=128):
+        super().__init__(maxsize=maxsize)
+
+    def get(self, user_id):
+        if reading_from_replica():
+            frame = self.lookup(user_id)
+            return frame if frame is not None else load_transaction_frame(user_id)
+        return self.get_or_build(user_id, load_transaction_frame)
+
+
+frame_cache = FrameCache(getattr(settings, 'ANALYTICS_CACHE_SIZE', 128))
+
+
+class AnalyticsEngine:
+    """
+    Vectorized aggregations over one user's cached transaction frame.
+    """
+    SECTIONS = ('category_month', 'weekday', 'rolling', 'top_merchants')
+
+    def __init__(self, frame):
+        self.frame = frame
+
+    @classmethod
+    def for_user(cls, user_id, start_date=None, end_date=None, category=None):
+        import pandas as pd
+
+        frame = frame_cache.get(user_id)
+        mask = None
+        if start_date:
+            mask = frame['date'] >= pd.Timestamp(start_date)
+        if end_date:
+            end_mask = frame['date'] <= pd.Timestamp(end_date)
+            mask = end_mask if mask is None else mask & end_mask
+        if category and category != 'all':
+            category_mask = frame['category'] == category
+            mask = category_mask if mask is None else mask & category_mask
+        return cls(frame if mask is None else frame[mask])
+
+    def category_month(self):
+        """
+        Category x month pivot of total spending.
+        """
+        months = self.frame['date'].dt.to_period('M')
+        pivot = self.frame.pivot_table(index='category', columns=months, values='amount',
+                                       aggfunc='sum', fill_value=0, observed=True)
+        return {
+            'categories': [str(name) for name in pivot.index],
+            'months': [str(month) for month in pivot.columns],
+            'values': pivot.round(2).values.tolist(),
+        }
+
+    def weekday(self):
+        """
+        Total, average and count of spending for each day of the week.
+        """
+        grouped = self.frame.groupby(self.frame['date'].dt.dayofweek)['amount'].agg(['sum', 'mean', 'count'])
+        grouped = grouped.reindex(range(7), fill_value=0)
+        names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        return [
+            {'day': names[day], 'total': round(float(row['sum']), 2),
+             'average': round(float(row['mean']), 2), 'count': int(row['count'])}
+            for day, row in grouped.iterrows()
+        ]
+
+    def rolling(self, windows=(30, 90)):
+        """
+        Daily spending with trailing rolling averages over the given day windows.
+        """
+        if self.frame.empty:
+            return []
+        daily = self.frame.groupby('date')['amount'].sum().asfreq('D', fill_value=0)
+        result = {'date': daily.index.strftime('%Y-%m-%d').tolist(), 'daily': daily.round(2).tolist()}
+        for window in windows:
+            result[f'avg_{window}'] = daily.rolling(window, min_periods=1).mean().round(2).tolist()
+        keys = list(result)
+        return [dict(zip(keys, values)) for values in zip(*result.values())]
+
+    def top_merchants(self, limit=10):
+        """
+        Merchants with the highest total spending.
+        """
+        grouped = self.frame.groupby('merchant', observed=True)['amount'].agg(['sum', 'count'])
+        grouped = grouped.nlargest(limit, 'sum')
+        return [
+            {'merchant': str(merchant), 'total': round(float(row['sum']), 2), 'count': int(row['count'])}
+            for merchant, row in grouped.iterrows()
+        ]
+
+    def run(self, sections=SECTIONS, limit=10):
+        handlers = {
+            'category_month': self.category_month,
+            'weekday': self.weekday,
+            'rolling': self.rolling,
+            'top_merchants': lambda: self.top_merchants(limit=limit),
+        }
+        return {section: handlers[section]() for section in sections}
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+class BackendConfig(AppConfig):
+    name = 'src.backend'
+    label = 'backend'
+    default_auto_field = 'django.db.models.BigAutoField'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401  (registers system checks and signal handlers)
+        from .search import install_search_indexes
+
+        post_migrate.connect(install_search_indexes, sender=self)
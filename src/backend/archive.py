@@ -0,0 +1,153 @@
+import os
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .models import Transaction, TransactionArchive, YearlyRollup
+from .versions import bump_data_version
+
+ARCHIVE_FIELDS = ['id', 'date', 'description', 'amount', 'category__name', 'fingerprint']
+ARCHIVE_COLUMNS = ['id', 'date', 'description', 'amount', 'category', 'fingerprint']
+DELETE_CHUNK_SIZE = 5000
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def archive_path(user_id, year):
+    """
+    Location of a user's archive for one year: parquet when pyarrow is installed,
+    compressed numpy arrays otherwise.
+    """
+    extension = 'parquet' if _has_pyarrow() else 'npz'
+    return os.path.join(settings.ARCHIVE_ROOT, str(user_id), f'{year}.{extension}')
+
+
+def read_archive(path):
+    """
+    Load an archive file back into a DataFrame with ARCHIVE_COLUMNS.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    with np.load(path, allow_pickle=False) as arrays:
+        frame = pd.DataFrame({column: arrays[column] for column in ARCHIVE_COLUMNS})
+    frame['date'] = pd.to_datetime(frame['date'])
+    # npz has no nulls: empty strings stand in for missing categories and fingerprints
+    for column in ('category', 'fingerprint'):
+        frame[column] = frame[column].replace('', None)
+    return frame
+
+
+def write_archive(frame, path):
+    """
+    Write the rows to `path` atomically, so an interrupted run never leaves a torn file.
+    """
+    import numpy as np
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = path + '.partial'
+    if path.endswith('.parquet'):
+        frame.to_parquet(partial, compression='zstd', index=False)
+    else:
+        with open(partial, 'wb') as archive_file:
+            np.savez_compressed(
+                archive_file,
+                id=frame['id'].to_numpy(dtype='int64'),
+                date=frame['date'].dt.strftime('%Y-%m-%d').to_numpy(dtype=str),
+                description=frame['description'].astype(str).to_numpy(dtype=str),
+                amount=frame['amount'].to_numpy(dtype='float64'),
+                category=frame['category'].fillna('').astype(str).to_numpy(dtype=str),
+                fingerprint=frame['fingerprint'].fillna('').astype(str).to_numpy(dtype=str),
+            )
+    os.replace(partial, path)
+
+
+def archived_before(user):
+    """
+    Date before which the user's history lives in archives, or None.
+    """
+    return TransactionArchive.objects.filter(user=user).aggregate(before=Max('archived_before'))['before']
+
+
+def _rollups(user, year, frame):
+    grouped = frame.groupby([frame['date'].dt.month, frame['category'].fillna('')], sort=True)['amount']
+    totals = grouped.agg(['sum', 'count'])
+    return [
+        YearlyRollup(user=user, year=year, month=int(month), category=category or None,
+                     total=round(float(row['sum']), 2), count=int(row['count']))
+        for (month, category), row in totals.iterrows()
+    ]
+
+
+def _delete_transactions(user, ids):
+    # A plain DELETE skips loading every row to send post_delete, and nothing references
+    # transactions; the data version is bumped once by the caller
+    table = connection.ops.quote_name(Transaction._meta.db_table)
+    chunk_size = min(DELETE_CHUNK_SIZE, (connection.features.max_query_params or DELETE_CHUNK_SIZE) - 1)
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            cursor.execute(
+                f"DELETE FROM {table} WHERE user_id = %s AND id IN ({', '.join(['%s'] * len(chunk))})",
+                [user.pk] + chunk,
+            )
+
+
+def archive_user(user, before, dry_run=False):
+    """
+    Move the user's transactions dated before `before` into per-year archive
+    files and replace those years' rollups. Rows already archived for a year are
+    merged with the new ones. Returns {year: rows moved}.
+
+    `before` is moved back to the first of its month, so every month is either
+    fully archived or fully in the table.
+    """
+    import pandas as pd
+
+    before = before.replace(day=1)
+    queryset = Transaction.objects.filter(user=user, date__lt=before)
+    years = sorted(queryset.dates('date', 'year'))
+    moved = {}
+    for year_date in years:
+        year = year_date.year
+        rows = queryset.filter(date__year=year).values_list(*ARCHIVE_FIELDS)
+        frame = pd.DataFrame.from_records(list(rows.iterator()), columns=ARCHIVE_COLUMNS)
+        moved[year] = len(frame)
+        if dry_run or frame.empty:
+            continue
+
+        frame['date'] = pd.to_datetime(frame['date'])
+        frame['amount'] = frame['amount'].astype('float64')
+        existing = TransactionArchive.objects.filter(user=user, year=year).first()
+        if existing is not None and os.path.exists(existing.path):
+            frame = pd.concat([read_archive(existing.path), frame], ignore_index=True).drop_duplicates('id')
+        frame = frame.sort_values('date', ignore_index=True)
+
+        path = archive_path(user.pk, year)
+        write_archive(frame, path)
+        if existing is not None and existing.path != path and os.path.exists(existing.path):
+            os.remove(existing.path)
+
+        ids = frame['id'].tolist()
+        with transaction.atomic():
+            YearlyRollup.objects.filter(user=user, year=year).delete()
+            YearlyRollup.objects.bulk_create(_rollups(user, year, frame))
+            TransactionArchive.objects.update_or_create(user=user, year=year, defaults={
+                'path': path,
+                'row_count': len(frame),
+                'archived_before': min(before, year_date.replace(year=year + 1)),
+            })
+            _delete_transactions(user, ids)
+
+    if moved and not dry_run:
+        bump_data_version(user.pk)
+    return moved
@@ -0,0 +1,50 @@
+import copy
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from .versions import VersionedCache
+
+AUTH_NAMESPACE = 'auth'
+
+
+class TokenCache(VersionedCache):
+    """
+    Per-worker TTL cache of token key -> (user, token), tagged with the user's
+    auth version. A logout, a password change or a deactivation bumps the version,
+    which revokes the entry on every worker only when the Django cache is shared
+    (Redis, memcached). With the per-process default cache, other workers keep
+    accepting a revoked token until its entry expires after TOKEN_CACHE_TTL.
+    """
+
+    def __init__(self, ttl=300, maxsize=10000):
+        super().__init__(namespace=AUTH_NAMESPACE, maxsize=maxsize, ttl=ttl)
+
+    def get(self, key):
+        cached = self.lookup(key)
+        if cached is None:
+            return None
+        user, token = cached
+        # Each request gets its own copy, views may modify request.user
+        return copy.copy(user), token
+
+    def set(self, key, user, token):
+        self.store(key, (user, token), user.pk)
+
+
+token_cache = TokenCache(getattr(settings, 'TOKEN_CACHE_TTL', 30), getattr(settings, 'TOKEN_CACHE_SIZE', 10000))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    DRF token authentication that remembers validated tokens for TOKEN_CACHE_TTL
+    seconds, so repeated requests skip the token and user query.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
@@ -0,0 +1,98 @@
+import re
+
+from django.conf import settings
+
+from .models import Category, CategorizationRule
+from .versions import VersionedCache
+from src.utils.sheet_utils import get_category
+
+RULES_NAMESPACE = 'rules'
+
+
+class RuleMatcher:
+    """
+    A user's categorization rules compiled once: lower-cased keywords, compiled
+    regexes and float amount bounds, tried in priority order.
+    """
+
+    def __init__(self, rules):
+        self.rules = [
+            (
+                rule.keyword.lower(),
+                re.compile(rule.pattern, re.IGNORECASE) if rule.pattern else None,
+                float(rule.min_amount) if rule.min_amount is not None else None,
+                float(rule.max_amount) if rule.max_amount is not None else None,
+                rule.category.name,
+            )
+            for rule in rules
+        ]
+
+    @classmethod
+    def for_user(cls, user_id):
+        return cls(CategorizationRule.objects.filter(user_id=user_id).select_related('category'))
+
+    def match(self, description, amount):
+        '''
+
+        :param description: raw statement description
+        :param amount: row amount, spending positive
+        :return: category name of the first matching rule, or None
+        '''
+        text = description.lower()
+        amount = float(amount)
+        for keyword, pattern, min_amount, max_amount, category in self.rules:
+            if keyword and keyword not in text:
+                continue
+            if min_amount is not None and amount < min_amount:
+                continue
+            if max_amount is not None and amount > max_amount:
+                continue
+            if pattern is not None and not pattern.search(description):
+                continue
+            return category
+        return None
+
+
+class MatcherCache(VersionedCache):
+    """
+    Per-worker LRU of compiled rule matchers, each tagged with the rules version
+    it was built from. Saving or deleting a rule or category bumps the version.
+    """
+
+    def __init__(self, maxsize=256):
+        super().__init__(namespace=RULES_NAMESPACE, maxsize=maxsize)
+
+    def get(self, user_id):
+        return self.get_or_build(user_id, RuleMatcher.for_user)
+
+
+matcher_cache = MatcherCache(getattr(settings, 'RULE_CACHE_SIZE', 256))
+
+
+def categories_for(user, names, known):
+    """
+    Return Category objects for the given names, creating missing ones in bulk.
+    `known` caches name -> Category across the batches of one import or job.
+    """
+    missing = {name for name in names if name not in known}
+    if missing:
+        Category.objects.bulk_create([Category(user=user, name=name) for name in missing], ignore_conflicts=True)
+        for category in Category.objects.filter(user=user, name__in=missing):
+            known[category.name] = category
+    return known
+
+
+def categorize_rows(user, rows, category_map):
+    """
+    Fill in the category of rows that have none: the user's own rules first,
+    then the global category dictionary.
+    """
+    matcher = None
+    for row in rows:
+        if row['category']:
+            continue
+        if matcher is None:
+            matcher = matcher_cache.get(user.pk)
+        row['category'] = (matcher.match(row['description'], row['amount'])
+                           or get_category(row['description'], category_map=category_map))
+    return rows
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_backend():
+    return settings.CACHES.get('default', {}).get('BACKEND')
+
+
+def cache_is_shared():
+    """
+    Whether every worker process sees the same Django cache, which holds the
+    data versions the per-worker frame, matcher and token caches check.
+    """
+    return cache_backend() not in PER_PROCESS_CACHES
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Data versions and token revocations reach other workers only through a
+    cache they share.
+    """
+    if cache_is_shared():
+        return []
+    return [Warning(
+        f"CACHE_BACKEND is {cache_backend()}, which each worker keeps to itself.",
+        hint=("With several worker processes, a write only invalidates the analytics frames and "
+              "compiled categorization rules of the worker that handled it; the others serve stale "
+              "data for as long as they live. A revoked API token keeps working on other workers for "
+              f"up to TOKEN_CACHE_TTL ({getattr(settings, 'TOKEN_CACHE_TTL', 30)}s). Use a shared cache "
+              "such as Redis when serving with several workers."),
+        id='backend.W001',
+    )]
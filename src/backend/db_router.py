@@ -0,0 +1,90 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.request import Request
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+# Signed cookie carrying the pin, so it reaches whichever worker serves the next request
+STICKY_COOKIE = 'primary_pin'
+STICKY_SALT = 'src.backend.db_router.primary_pin'
+
+
+def replica_alias():
+    """
+    Return the configured replica database alias, or None when no replica is set up.
+    """
+    alias = getattr(settings, 'REPLICA_DB_ALIAS', None)
+    if alias and alias in connections.databases:
+        return alias
+    return None
+
+
+def reading_from_replica():
+    """
+    Whether reads in the current context are routed to the replica.
+    """
+    return _replica_reads.get()
+
+
+def pin_to_primary(response, user_id):
+    """
+    Keep the user's reads on the primary for REPLICA_STICKY_SECONDS after a write,
+    so they read their own writes while the replica catches up. The pin is a
+    short-lived signed cookie, so every worker sees it without shared state.
+    """
+    response.set_signed_cookie(
+        STICKY_COOKIE, str(user_id), salt=STICKY_SALT, max_age=settings.REPLICA_STICKY_SECONDS,
+        httponly=True, samesite='Lax',
+    )
+
+
+def is_pinned_to_primary(request, user_id):
+    # The signature's timestamp bounds the pin even if a client keeps the cookie longer
+    pinned = request.get_signed_cookie(STICKY_COOKIE, default=None, salt=STICKY_SALT,
+                                       max_age=settings.REPLICA_STICKY_SECONDS)
+    return pinned == str(user_id)
+
+
+def read_from_replica(view_func):
+    """
+    Run the read-only analytics view against the replica database.
+
+    Falls back to the primary when no replica is configured or when the user
+    wrote recently. Apply it below @action / @permission_classes so the wrapped
+    function receives the DRF request.
+    """
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        if replica_alias() is None or is_pinned_to_primary(request, request.user.pk):
+            return view_func(*args, **kwargs)
+
+        token = _replica_reads.set(True)
+        try:
+            return view_func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+class AnalyticsReplicaRouter:
+    """
+    Route reads made inside @read_from_replica views to the replica.
+    Every other read and all writes go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return replica_alias()
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replica and primary hold the same data
+        return True
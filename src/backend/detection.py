@@ -0,0 +1,198 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from .analytics import normalize_merchant
+from .models import DetectionCheckpoint, RecurringPayment, SpendingAnomaly, Transaction
+from src.utils.config_utils import read_category_config
+from src.utils.sheet_utils import get_category
+
+# Recognised payment cadences: name -> period in days
+PERIODS = {
+    'weekly': 7,
+    'monthly': 30,
+    'quarterly': 91,
+    'yearly': 365,
+}
+PERIOD_TOLERANCE = 0.15
+RECURRING_LOOKBACK_DAYS = 400
+MIN_OCCURRENCES = 3
+MIN_ANOMALY_MONTHS = 4
+# Deviation floor as a fraction of the baseline, so flat categories can still spike
+MIN_DEVIATION_FRACTION = 0.1
+ROW_FIELDS = ['id', 'date', 'amount', 'description', 'category__name']
+AMOUNT_CHUNK_SIZE = 500
+
+
+def _spending(user):
+    """
+    The user's debits: credits (salary, refunds) are neither payments nor spending.
+    """
+    return Transaction.objects.filter(user=user, amount__gt=0)
+
+
+def _rows_frame(queryset):
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(list(queryset.values_list(*ROW_FIELDS).iterator()),
+                                      columns=['id', 'date', 'amount', 'description', 'category'])
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame['category'] = frame['category'].fillna('Unknown')
+    frame['merchant'] = normalize_merchant(frame['description'].astype(str))
+    return frame
+
+
+def _payment_kind(category, merchant, category_map):
+    name = category.lower() if category and category != 'Unknown' else get_category(merchant, category_map).lower()
+    if name == 'necessary':
+        return 'emi'
+    if name == 'subscription':
+        return 'subscription'
+    return 'recurring'
+
+
+def detect_recurring(user, new_rows):
+    """
+    Find periodic same-merchant, same-amount series touched by the new rows.
+
+    Only history with one of the new rows' amounts inside the lookback window is
+    loaded, so the cost follows the size of the import, not of the user's history.
+    """
+    import numpy as np
+    import pandas as pd
+
+    amounts = list(new_rows['amount'].unique())
+    since = new_rows['date'].min() - timedelta(days=RECURRING_LOOKBACK_DAYS)
+    history = pd.concat([
+        _rows_frame(_spending(user).filter(
+            date__gte=since.date(), amount__in=amounts[start:start + AMOUNT_CHUNK_SIZE]
+        ))
+        for start in range(0, len(amounts), AMOUNT_CHUNK_SIZE)
+    ], ignore_index=True)
+
+    keys = new_rows[['merchant', 'amount']].drop_duplicates()
+    history = history.merge(keys, on=['merchant', 'amount'])
+    if history.empty:
+        return []
+
+    history = history.sort_values(['merchant', 'amount', 'date'])
+    history['gap'] = history.groupby(['merchant', 'amount'])['date'].diff().dt.days
+    series = history.groupby(['merchant', 'amount']).agg(
+        occurrences=('date', 'size'),
+        first_date=('date', 'min'),
+        last_date=('date', 'max'),
+        median_gap=('gap', 'median'),
+        gap_std=('gap', 'std'),
+        category=('category', 'last'),
+    ).reset_index()
+    series = series[series['occurrences'] >= MIN_OCCURRENCES]
+
+    # Regular gaps that match one of the known cadences
+    period_days = np.array(list(PERIODS.values()))
+    distance = np.abs(series['median_gap'].to_numpy()[:, None] - period_days[None, :])
+    matches = distance <= period_days[None, :] * PERIOD_TOLERANCE
+    regular = series['gap_std'].fillna(0).to_numpy() <= series['median_gap'].to_numpy() * PERIOD_TOLERANCE
+    keep = matches.any(axis=1) & regular
+    period_index = np.argmax(matches[keep], axis=1)
+    series = series[keep]
+
+    category_map = read_category_config()
+    period_names = list(PERIODS)
+    payments = []
+    for (_, row), index in zip(series.iterrows(), period_index):
+        last_date = row['last_date'].date()
+        payments.append(RecurringPayment(
+            user=user,
+            merchant=row['merchant'],
+            amount=row['amount'],
+            kind=_payment_kind(row['category'], row['merchant'], category_map),
+            period=period_names[index],
+            period_days=int(period_days[index]),
+            occurrences=int(row['occurrences']),
+            first_date=row['first_date'].date(),
+            last_date=last_date,
+            next_expected=last_date + timedelta(days=int(round(row['median_gap']))),
+        ))
+
+    RecurringPayment.objects.bulk_create(
+        payments,
+        update_conflicts=True,
+        unique_fields=['user', 'merchant', 'amount'],
+        update_fields=['kind', 'period', 'period_days', 'occurrences', 'first_date', 'last_date', 'next_expected'],
+    )
+    return payments
+
+
+def detect_anomalies(user, month_totals, new_rows):
+    """
+    Fold the new rows into the running category x month totals and flag months
+    whose total is a z-score outlier against the category's other months.
+    """
+    import numpy as np
+
+    months = new_rows['date'].dt.strftime('%Y-%m')
+    added = new_rows.groupby([new_rows['category'], months])['amount'].sum()
+    for (category, month), amount in added.items():
+        totals = month_totals.setdefault(category, {})
+        totals[month] = round(totals.get(month, 0) + float(amount), 2)
+
+    threshold = getattr(settings, 'ANOMALY_Z_THRESHOLD', 3.0)
+    touched = list(added.index.get_level_values(0).unique())
+    anomalies = []
+    for category in touched:
+        labels = list(month_totals[category])
+        values = np.array([month_totals[category][label] for label in labels])
+        count = len(values)
+        if count <= MIN_ANOMALY_MONTHS:
+            continue
+
+        # Leave-one-out mean and deviation for every month at once
+        others = count - 1
+        mean = (values.sum() - values) / others
+        variance = ((values ** 2).sum() - values ** 2) / others - mean ** 2
+        deviation = np.maximum(np.sqrt(np.clip(variance, 0, None)), MIN_DEVIATION_FRACTION * np.abs(mean))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_scores = np.where(deviation > 0, (values - mean) / deviation, 0.0)
+
+        for index in np.flatnonzero(z_scores > threshold):
+            anomalies.append(SpendingAnomaly(
+                user=user,
+                category=category,
+                month=labels[index],
+                total=Decimal(str(values[index])),
+                baseline=round(float(mean[index]), 2),
+                z_score=round(float(z_scores[index]), 2),
+            ))
+
+    # Baselines moved, so the touched categories are re-flagged from scratch
+    SpendingAnomaly.objects.filter(user=user, category__in=touched).delete()
+    SpendingAnomaly.objects.bulk_create(anomalies)
+    return anomalies
+
+
+def run_detection(user, full=False):
+    """
+    Process the user's transactions added since the last checkpoint.
+    With full=True the checkpoint is reset and the whole history is rescanned.
+    """
+    with transaction.atomic():
+        checkpoint, _ = DetectionCheckpoint.objects.select_for_update().get_or_create(user=user)
+        if full:
+            checkpoint.last_transaction_id = 0
+            checkpoint.month_totals = {}
+            RecurringPayment.objects.filter(user=user).delete()
+            SpendingAnomaly.objects.filter(user=user).delete()
+
+        new_rows = _rows_frame(_spending(user).filter(id__gt=checkpoint.last_transaction_id))
+        if new_rows.empty:
+            return {'processed': 0, 'recurring': 0, 'anomalies': 0}
+
+        recurring = detect_recurring(user, new_rows)
+        anomalies = detect_anomalies(user, checkpoint.month_totals, new_rows)
+
+        checkpoint.last_transaction_id = int(new_rows['id'].max())
+        checkpoint.save()
+
+    return {'processed': len(new_rows), 'recurring': len(recurring), 'anomalies': len(anomalies)}
@@ -0,0 +1,81 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .archive import archived_before
+from .categorization import categories_for, categorize_rows
+from .models import Transaction, transaction_fingerprint
+from .versions import bump_data_version
+from src.utils.config_utils import read_category_config
+from src.utils.statement_readers import iter_statement, normalize_description
+
+
+def import_statement(user, source, filename=None, **reader_options):
+    """
+    Stream a statement file through the matching reader and insert its rows in
+    batches. Rows without a category get one from the user's categorization
+    rules, falling back to the category dictionary.
+
+    Each row is fingerprinted and the fingerprints of a whole batch are checked
+    in one query, so rows imported before (overlapping or repeated statements)
+    are skipped. Rows dated in the user's archived history are skipped as well,
+    since their fingerprints left the table with them, and counted on their own.
+    Imports of one user run one at a time, so a statement uploaded twice at once
+    is skipped by the second import rather than raced.
+    Returns (created, duplicates skipped, archived skipped) counts.
+    """
+    category_map = read_category_config()
+    archive_cutoff = archived_before(user)
+    known = {}
+    seen = Counter()
+    created = skipped = archived = 0
+
+    with transaction.atomic():
+        # Holds off the user's other imports until this one commits
+        User.objects.select_for_update().only('pk').get(pk=user.pk)
+        for batch in iter_statement(source, filename=filename, **reader_options):
+            for row in batch:
+                key = (row['date'], row['amount'], normalize_description(row['description']))
+                row['fingerprint'] = transaction_fingerprint(user.pk, *key, ordinal=seen[key])
+                seen[key] += 1
+
+            if archive_cutoff is not None:
+                current = [row for row in batch if row['date'] >= archive_cutoff]
+                archived += len(batch) - len(current)
+                batch = current
+            existing = set(Transaction.objects.filter(
+                fingerprint__in=[row['fingerprint'] for row in batch]
+            ).values_list('fingerprint', flat=True))
+            new_rows = [row for row in batch if row['fingerprint'] not in existing]
+            skipped += len(batch) - len(new_rows)
+            if not new_rows:
+                continue
+
+            for row in new_rows:
+                row['category_source'] = 'user' if row['category'] else 'auto'
+            categorize_rows(user, new_rows, category_map)
+            categories_for(user, {row['category'] for row in new_rows}, known)
+            # ignore_conflicts drops rows whose fingerprint another writer (a single save) took
+            # since the check above, so count what the insert added instead of what was sent
+            present = Transaction.objects.filter(fingerprint__in=[row['fingerprint'] for row in new_rows])
+            before = present.count()
+            Transaction.objects.bulk_create([
+                Transaction(
+                    user=user,
+                    date=row['date'],
+                    description=row['description'],
+                    amount=row['amount'],
+                    category=known[row['category']],
+                    category_source=row['category_source'],
+                    fingerprint=row['fingerprint']
+                )
+                for row in new_rows
+            ], ignore_conflicts=True)
+            inserted = present.count() - before
+            created += inserted
+            skipped += len(new_rows) - inserted
+
+    if created:
+        bump_data_version(user.pk)
+    return created, skipped, archived
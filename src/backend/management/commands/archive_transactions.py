@@ -0,0 +1,40 @@
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from src.backend.archive import archive_user
+
+
+class Command(BaseCommand):
+    help = "Move old transactions into per-user, per-year compressed archives with monthly rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', default=None,
+                            help='Archive transactions dated before this YYYY-MM-DD (rounded down to the month)')
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help='Archive transactions older than this many days (default ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--user', default=None, help='Only archive this username')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would be archived')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                before = datetime.strptime(options['before'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--before must be a YYYY-MM-DD date")
+        else:
+            days = options['older_than_days'] or settings.ARCHIVE_AFTER_DAYS
+            before = date.today() - timedelta(days=days)
+
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        for user in users.iterator():
+            moved = archive_user(user, before, dry_run=options['dry_run'])
+            if moved:
+                years = ', '.join(f'{year}: {rows}' for year, rows in moved.items())
+                verb = 'would archive' if options['dry_run'] else 'archived'
+                self.stdout.write(f"{user.username}: {verb} {sum(moved.values())} transactions ({years})")
@@ -0,0 +1,51 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from src.backend.models import Transaction, transaction_fingerprint
+from src.utils.statement_readers import normalize_description
+
+
+class Command(BaseCommand):
+    help = "Fingerprint transactions saved before duplicate detection existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows fingerprinted per update')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        user_ids = (Transaction.objects.filter(fingerprint__isnull=True)
+                    .values_list('user_id', flat=True).distinct())
+
+        for user_id in list(user_ids):
+            seen = Counter()
+            pending = Transaction.objects.filter(user_id=user_id, fingerprint__isnull=True).order_by('id')
+            last_id = 0
+            while True:
+                batch = list(pending.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                keys = {}
+                for row in batch:
+                    keys[row.id] = (row.date, row.amount, normalize_description(row.description))
+                    row.fingerprint = transaction_fingerprint(user_id, *keys[row.id], ordinal=seen[keys[row.id]])
+                    seen[keys[row.id]] += 1
+
+                # Rows imported after these legacy rows may already hold an ordinal: take the next one
+                clashing = batch
+                while clashing:
+                    taken = set(Transaction.objects.filter(
+                        fingerprint__in=[row.fingerprint for row in clashing]
+                    ).values_list('fingerprint', flat=True))
+                    clashing = [row for row in clashing if row.fingerprint in taken]
+                    for row in clashing:
+                        row.fingerprint = transaction_fingerprint(user_id, *keys[row.id], ordinal=seen[keys[row.id]])
+                        seen[keys[row.id]] += 1
+
+                Transaction.objects.bulk_update(batch, ['fingerprint'])
+                updated += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Fingerprinted {updated} transactions"))
@@ -0,0 +1,90 @@
+import json
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from src.backend.models import Category, Transaction
+from src.backend.renderers import ColumnarRenderer, FastJSONRenderer, columnar_rows, orjson
+from src.backend.serializers import TransactionSerializer
+from src.backend.views import TransactionViewSet
+
+BENCH_USERNAME = 'bench_renderers'
+
+
+def seed_transactions(user, rows, rng):
+    """
+    Insert transactions shaped like a real user's history.
+    """
+    categories = Category.objects.bulk_create([
+        Category(user=user, name=name)
+        for name in ['Groceries', 'Dining', 'Transport', 'Shopping', 'Utilities', 'Subscription']
+    ])
+    today = date.today()
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user,
+            date=today - timedelta(days=rng.randint(0, 730)),
+            description=f'POS {rng.randint(1, 10 ** 6)} MERCHANT {rng.randint(1, 500)}',
+            amount=Decimal(f'{rng.uniform(10, 5000):.2f}'),
+            category=rng.choice(categories),
+        )
+        for _ in range(rows)
+    ], batch_size=5000)
+
+
+def best_of(function, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = ("Compare the transaction list's serializer path under each renderer with the "
+            "?format=columnar path that reads values_list without serializers")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', default='10000,100000', help='Comma-separated payload sizes')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement, the best is reported')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        report = {'orjson': orjson is not None, 'sizes': {}}
+        for rows in [int(value) for value in options['rows'].split(',') if value.strip()]:
+            report['sizes'][rows] = self._measure(rows, random.Random(options['seed']), options['repeat'])
+        self.stdout.write(json.dumps(report, indent=2))
+
+    @staticmethod
+    def _measure(rows, rng, repeat):
+        # The rows only exist for the measurement: everything is rolled back afterwards
+        with transaction.atomic():
+            user = User.objects.create_user(username=BENCH_USERNAME)
+            seed_transactions(user, rows, rng)
+            # The same queryset TransactionViewSet.list serves
+            queryset = Transaction.objects.filter(user=user).select_related('category').order_by('-date')
+
+            serialize_ms, data = best_of(lambda: TransactionSerializer(queryset.all(), many=True).data, repeat)
+            result = {'serializer_ms': round(serialize_ms, 2)}
+            for name, renderer in [('drf_json', JSONRenderer()), ('fast_json', FastJSONRenderer()),
+                                   ('columnar_serialized', ColumnarRenderer())]:
+                render_ms, payload = best_of(lambda: renderer.render(data), repeat)
+                result[name] = {'render_ms': round(render_ms, 2), 'total_ms': round(serialize_ms + render_ms, 2),
+                                'bytes': len(payload)}
+
+            # ColumnarListMixin's path: values_list straight into arrays, no model instances or serializers
+            fetch_ms, columns = best_of(lambda: columnar_rows(queryset.all(), TransactionViewSet.columnar_fields),
+                                        repeat)
+            render_ms, payload = best_of(lambda: ColumnarRenderer().render(columns), repeat)
+            result['columnar'] = {'fetch_ms': round(fetch_ms, 2), 'render_ms': round(render_ms, 2),
+                                  'total_ms': round(fetch_ms + render_ms, 2), 'bytes': len(payload)}
+            transaction.set_rollback(True)
+        return result
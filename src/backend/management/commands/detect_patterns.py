@@ -0,0 +1,25 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from src.backend.detection import run_detection
+
+
+class Command(BaseCommand):
+    help = "Detect recurring payments and spending anomalies from the last checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=None, help='Only process this username')
+        parser.add_argument('--full', action='store_true',
+                            help='Reset the checkpoint and rescan the whole history (after edits or deletes)')
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        for user in users.iterator():
+            result = run_detection(user, full=options['full'])
+            self.stdout.write(
+                f"{user.username}: {result['processed']} transactions, "
+                f"{result['recurring']} recurring payments, {result['anomalies']} anomalies"
+            )
@@ -0,0 +1,134 @@
+import json
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+
+from src.backend.middleware import percentile
+
+# Endpoint name -> (method, path relative to the API base URL)
+ENDPOINTS = {
+    'summary': ('GET', 'expenses/summary/'),
+    'monthly_summary': ('GET', 'expenses/monthly_summary/'),
+    'spending_summary': ('GET', 'summary/'),
+    'monthly_spending': ('GET', 'monthly/'),
+    'transactions': ('GET', 'transactions/'),
+    'expenses': ('GET', 'expenses/'),
+    'categories': ('GET', 'categories/'),
+    'upload_csv': ('POST', 'upload-csv/'),
+}
+
+
+def build_csv_upload(rows, rng):
+    """
+    Build a multipart/form-data body holding a generated CSV statement.
+    """
+    today = date.today()
+    lines = ['date,description,amount,category']
+    for _ in range(rows):
+        day = today - timedelta(days=rng.randint(0, 365))
+        lines.append(f'{day:%Y-%m-%d},LOADTEST {rng.randint(1, 10 ** 6)},{rng.uniform(10, 5000):.2f},Shopping')
+
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\n'
+        'Content-Disposition: form-data; name="file"; filename="loadtest.csv"\r\n'
+        'Content-Type: text/csv\r\n\r\n'
+        + '\n'.join(lines) +
+        f'\r\n--{boundary}--\r\n'
+    ).encode('utf-8')
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class Command(BaseCommand):
+    help = "Drive concurrent load against the API and report throughput and latency percentiles as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000/api/', help='API base URL')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS),
+                            help='Comma-separated endpoint names to exercise')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent clients')
+        parser.add_argument('--prefix', default='loadtest', help='Log in as the users seeded with this prefix')
+        parser.add_argument('--upload-rows', type=int, default=100, help='Rows per upload_csv request')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+        users = list(User.objects.filter(username__startswith=f"{options['prefix']}_"))
+        # API tokens, as the frontend uses; created directly instead of logging in as every user
+        Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users],
+                               ignore_conflicts=True)
+        credentials = list(Token.objects.filter(user__in=users).values_list('key', flat=True))
+        if not credentials:
+            raise CommandError("No seeded users found, run seed_transactions first")
+
+        base_url = options['base_url'].rstrip('/') + '/'
+        report = {
+            'base_url': base_url,
+            'concurrency': options['concurrency'],
+            'requests_per_endpoint': options['requests'],
+            'endpoints': {},
+        }
+        for name in names:
+            report['endpoints'][name] = self._run_endpoint(name, base_url, credentials, options)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output)
+        self.stdout.write(output)
+
+    def _run_endpoint(self, name, base_url, credentials, options):
+        method, path = ENDPOINTS[name]
+        timeout = options['timeout']
+
+        def call(index):
+            rng = random.Random(index)
+            body, content_type = None, None
+            if method == 'POST':
+                body, content_type = build_csv_upload(options['upload_rows'], rng)
+            request = Request(base_url + path, data=body, method=method)
+            request.add_header('Authorization', f'Token {credentials[index % len(credentials)]}')
+            if content_type:
+                request.add_header('Content-Type', content_type)
+
+            start = time.perf_counter()
+            try:
+                with urlopen(request, timeout=timeout) as response:
+                    response.read()
+                    ok = response.status < 400
+            except (HTTPError, URLError, OSError):
+                ok = False
+            return (time.perf_counter() - start) * 1000, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            results = list(executor.map(call, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, ok in results if not ok),
+            'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0,
+            'latency_ms': {
+                'mean': round(sum(latencies) / len(latencies), 2),
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'max': round(latencies[-1], 2),
+            },
+        }
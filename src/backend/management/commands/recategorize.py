@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from src.backend.models import RecategorizationJob
+from src.backend.recategorize import ACTIVE_STATUSES, CHUNK_SIZE, create_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Re-categorize existing transactions with the current rules and category dictionary"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=None, help='Only process this username')
+        parser.add_argument('--only-uncategorized', action='store_true',
+                            help='Only transactions without a category or in Unknown')
+        parser.add_argument('--overwrite-user-categories', action='store_true',
+                            help='Also replace categories that came from the statement or were set by hand')
+        parser.add_argument('--resume', action='store_true',
+                            help='Only resume unfinished jobs, e.g. ones a stopped worker left running')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Transactions per batch')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['resume']:
+            jobs = RecategorizationJob.objects.filter(status__in=ACTIVE_STATUSES).select_related('user')
+            if options['user']:
+                jobs = jobs.filter(user__username=options['user'])
+            jobs = list(jobs)
+        else:
+            users = User.objects.all()
+            if options['user']:
+                users = users.filter(username=options['user'])
+            jobs = [
+                create_job(user, only_uncategorized=options['only_uncategorized'],
+                           overwrite_user_categories=options['overwrite_user_categories'])
+                for user in users.iterator()
+            ]
+
+        for job in jobs:
+            job = run_job(job, chunk_size=options['chunk_size'], on_chunk=self._report)
+            self.stdout.write(
+                f"{job.user.username}: {job.status}, {job.processed} transactions, {job.changed} changed"
+                + (f" ({job.error})" if job.error else '')
+            )
+
+    def _report(self, job):
+        if self.verbosity >= 2:
+            self.stdout.write(f"{job.user.username}: {job.processed}/{job.total}")
@@ -0,0 +1,167 @@
+import random
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from src.backend.models import Category, Expense, Transaction, transaction_fingerprint
+from src.utils.config_utils import read_category_config
+
+# (relative frequency, median amount, spread) per category of category_dictionary.yml
+CATEGORY_PROFILES = {
+    'food': (30, 350, 0.6),
+    'shopping': (18, 1200, 0.9),
+    'drinks': (6, 900, 0.5),
+    'groceries': (14, 2000, 0.5),
+    'medical': (4, 800, 0.8),
+    'charity': (1, 1000, 0.4),
+    'investment': (3, 5000, 0.7),
+}
+DEFAULT_PROFILE = (5, 500, 0.8)
+
+# Categories that recur monthly on a fixed day with a fixed amount
+RECURRING_CATEGORIES = {
+    'subscription': (1, 3),
+    'necessary': (1, 2),
+}
+
+
+class Command(BaseCommand):
+    help = "Seed N users x M transactions (and expenses) with realistic categories and dates for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of users to create')
+        parser.add_argument('--transactions', type=int, default=1000, help='Transactions per user')
+        parser.add_argument('--expenses', type=int, default=None,
+                            help='Expenses per user, which the expense summaries aggregate (default transactions / 5)')
+        parser.add_argument('--days', type=int, default=730, help='Spread transactions over this many past days')
+        parser.add_argument('--prefix', default='loadtest', help='Username prefix for seeded users')
+        parser.add_argument('--password', default='loadtest-password', help='Password for seeded users')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        categories = read_category_config()['categories']
+        batch_size = options['batch_size']
+        end_date = date.today()
+        start_date = end_date - timedelta(days=options['days'])
+
+        expense_count = options['expenses']
+        if expense_count is None:
+            expense_count = options['transactions'] // 5
+
+        users = self._create_users(options['users'], options['prefix'], options['password'])
+        created = expenses = 0
+        for user in users:
+            category_objects = self._create_categories(user, categories)
+            rows = self._generate_rows(rng, user, category_objects, categories,
+                                       options['transactions'], start_date, end_date)
+            created += self._bulk_insert(Transaction, self._fingerprinted(rows), batch_size)
+            rows = self._generate_rows(rng, user, category_objects, categories,
+                                       expense_count, start_date, end_date)
+            expenses += self._bulk_insert(Expense, (
+                Expense(user=user, date=row.date, description=row.description.title(),
+                        amount=row.amount, category=row.category)
+                for row in rows
+            ), batch_size)
+            self.stdout.write(f"Seeded {user.username}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(users)} users, {created} transactions and {expenses} expenses"
+        ))
+
+    @staticmethod
+    def _bulk_insert(model, rows, batch_size):
+        created = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+                created += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+        return created
+
+    @staticmethod
+    def _fingerprinted(rows):
+        # bulk_create skips Transaction.save, so fingerprints are set here like the importer does
+        seen = Counter()
+        for row in rows:
+            key = (row.date, row.amount, row.description)
+            row.fingerprint = transaction_fingerprint(row.user_id, *key, ordinal=seen[key])
+            seen[key] += 1
+            yield row
+
+    @transaction.atomic
+    def _create_users(self, count, prefix, password):
+        # Hash once: the hasher is deliberately slow and every seeded user shares the password
+        password_hash = make_password(password)
+        existing = User.objects.filter(username__startswith=f'{prefix}_').count()
+        User.objects.bulk_create([
+            User(username=f'{prefix}_{existing + index}', password=password_hash)
+            for index in range(count)
+        ])
+        return list(User.objects.filter(
+            username__in=[f'{prefix}_{existing + index}' for index in range(count)]
+        ))
+
+    @staticmethod
+    def _create_categories(user, categories):
+        Category.objects.bulk_create(
+            [Category(user=user, name=name.capitalize()) for name in categories] +
+            [Category(user=user, name='Unknown')],
+            ignore_conflicts=True
+        )
+        return {category.name.lower(): category for category in Category.objects.filter(user=user)}
+
+    @staticmethod
+    def _generate_rows(rng, user, category_objects, categories, count, start_date, end_date):
+        span = (end_date - start_date).days
+
+        # Monthly fixed payments first, so they form realistic periodic series
+        recurring = []
+        for name, (low, high) in RECURRING_CATEGORIES.items():
+            for merchant in rng.sample(categories.get(name, []), min(len(categories.get(name, [])),
+                                                                     rng.randint(low, high))):
+                recurring.append((name, merchant, rng.randint(1, 28), round(rng.uniform(200, 15000), 2)))
+
+        generated = 0
+        month = date(start_date.year, start_date.month, 1)
+        while month <= end_date and generated < count:
+            for name, merchant, day, amount in recurring:
+                payment_date = month.replace(day=day)
+                if start_date <= payment_date <= end_date and generated < count:
+                    generated += 1
+                    yield Transaction(
+                        user=user, date=payment_date, description=f'{merchant.upper()} AUTOPAY',
+                        amount=Decimal(str(amount)), category=category_objects.get(name)
+                    )
+            month = (month + timedelta(days=32)).replace(day=1)
+
+        names = [name for name in categories if name not in RECURRING_CATEGORIES]
+        weights = [CATEGORY_PROFILES.get(name, DEFAULT_PROFILE)[0] for name in names]
+        while generated < count:
+            name = rng.choices(names, weights)[0]
+            _, median, spread = CATEGORY_PROFILES.get(name, DEFAULT_PROFILE)
+            transaction_date = start_date + timedelta(days=rng.randint(0, span))
+            # Weekends see noticeably more discretionary spending
+            if transaction_date.weekday() < 5 and rng.random() < 0.25:
+                transaction_date += timedelta(days=5 - transaction_date.weekday())
+                if transaction_date > end_date:
+                    transaction_date = end_date
+            amount = round(rng.lognormvariate(0, spread) * median, 2)
+            merchant = rng.choice(categories[name] or [name])
+            generated += 1
+            yield Transaction(
+                user=user, date=transaction_date,
+                description=f'{merchant.upper()} {rng.randint(100000, 999999)}',
+                amount=Decimal(str(amount)), category=category_objects.get(name)
+            )
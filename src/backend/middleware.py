@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .db_router import pin_to_primary, replica_alias
+
+logger = logging.getLogger(__name__)
+
+# The current request's QueryTimer, for queries the request runs on other threads
+current_query_timer = ContextVar('current_query_timer', default=None)
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that counts queries and accumulates their duration.
+    Thread-safe, so helper threads of one request can share it.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+
+    def install(self, stack):
+        """
+        Wrap every database connection of the current thread until `stack` closes.
+        """
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class EndpointStats:
+    """
+    Rolling per-endpoint samples of request timings, kept in memory per worker.
+    Only the last `window` requests of every endpoint are retained.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._requests = defaultdict(int)
+        self._flagged = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, total_ms, db_ms, queries, flagged=False):
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+            samples.append((total_ms, db_ms, queries))
+            self._requests[endpoint] += 1
+            if flagged:
+                self._flagged[endpoint] += 1
+
+    def snapshot(self):
+        with self._lock:
+            samples = {endpoint: list(values) for endpoint, values in self._samples.items()}
+            requests = dict(self._requests)
+            flagged = dict(self._flagged)
+
+        result = {}
+        for endpoint, values in samples.items():
+            totals = sorted(value[0] for value in values)
+            db_times = sorted(value[1] for value in values)
+            queries = [value[2] for value in values]
+            result[endpoint] = {
+                'requests': requests[endpoint],
+                'n_plus_one_flagged': flagged.get(endpoint, 0),
+                'total_ms': {
+                    'p50': round(percentile(totals, 0.50), 2),
+                    'p95': round(percentile(totals, 0.95), 2),
+                    'p99': round(percentile(totals, 0.99), 2),
+                },
+                'db_ms': {
+                    'p50': round(percentile(db_times, 0.50), 2),
+                    'p95': round(percentile(db_times, 0.95), 2),
+                    'p99': round(percentile(db_times, 0.99), 2),
+                },
+                'queries': {
+                    'avg': round(sum(queries) / len(queries), 2),
+                    'max': max(queries),
+                },
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._requests.clear()
+            self._flagged.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+class PerformanceMiddleware:
+    """
+    Record query count, DB time, view time and render time for every request.
+
+    The timings are sent back as `Server-Timing` headers and fed into the
+    rolling per-endpoint statistics exposed by the staff-only stats view.
+    When PERF_INSTRUMENTATION is off the middleware removes itself at startup,
+    so disabled instrumentation costs nothing per request.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERF_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.query_threshold = getattr(settings, 'PERF_QUERY_THRESHOLD', 50)
+        endpoint_stats.window = getattr(settings, 'PERF_HISTOGRAM_WINDOW', 1000)
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._perf_view_start = None
+        request._perf_view_end = None
+
+        start = time.perf_counter()
+        token = current_query_timer.set(timer)
+        try:
+            with ExitStack() as stack:
+                timer.install(stack)
+                response = self.get_response(request)
+        finally:
+            current_query_timer.reset(token)
+        end = time.perf_counter()
+
+        total_ms = (end - start) * 1000
+        db_ms = timer.duration * 1000
+        view_start = request._perf_view_start or start
+        view_end = request._perf_view_end or end
+        view_ms = (view_end - view_start) * 1000
+        render_ms = (end - view_end) * 1000
+
+        flagged = timer.count > self.query_threshold
+        if flagged:
+            logger.warning(
+                "Possible N+1 query pattern: %s %s ran %d queries (threshold %d)",
+                request.method, request.path, timer.count, self.query_threshold
+            )
+            response['X-Query-Count-Warning'] = str(timer.count)
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.2f};desc="{timer.count} queries"',
+            f'view;dur={view_ms:.2f}',
+            f'render;dur={render_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+
+        endpoint_stats.record(self._endpoint_name(request), total_ms, db_ms, timer.count, flagged)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._perf_view_start = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        # Called after the view returns and before DRF renders the response body
+        request._perf_view_end = time.perf_counter()
+        return response
+
+    @staticmethod
+    def _endpoint_name(request):
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match is not None else 'unresolved'
+        return f'{request.method} {route}'
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Pin users to the primary database for a short window after a successful write,
+    so analytics views routed to the replica never miss the user's own changes.
+    The pin is a signed cookie on the response, honoured by every worker.
+    """
+    WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        if replica_alias() is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in self.WRITE_METHODS and response.status_code < 400:
+            # DRF copies the authenticated user back onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_to_primary(response, user.pk)
+        return response
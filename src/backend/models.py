@@ -1,10 +1,32 @@
+import hashlib
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from src.utils.statement_readers import normalize_description
+
+# Fingerprint ordinals tried when a manually saved transaction repeats an existing one
+MAX_FINGERPRINT_ORDINAL = 20
+
+
+def transaction_fingerprint(user_id, date, amount, description, ordinal=0):
+    """
+    Hash identifying a transaction by user, date, amount and normalized description.
+    `ordinal` tells apart genuinely repeated rows (two identical coffees on one day)
+    by their position among the identical rows of the same statement.
+    """
+    amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+    key = f"{user_id}|{date.isoformat()}|{amount}|{normalize_description(description)}|{ordinal}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
 
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
+    description = models.CharField(max_length=255, blank=True, default='')
+    color = models.CharField(max_length=7, default='#6c757d')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='categories')
 
     def __str__(self):
@@ -28,4 +50,199 @@ class Expense(models.Model):
         return f"{self.description} - ${self.amount}"
 
     class Meta:
-        ordering = ['-date']
\ No newline at end of file
+        ordering = ['-date']
+
+
+class Transaction(models.Model):
+    CATEGORY_SOURCE_CHOICES = [
+        ('auto', 'Rules or category dictionary'),
+        ('user', 'Statement or user'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transactions')
+    date = models.DateField(default=timezone.now)
+    description = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True,
+                                 related_name='transactions')
+    # Re-categorization leaves categories the user supplied alone unless asked to overwrite them
+    category_source = models.CharField(max_length=4, choices=CATEGORY_SOURCE_CHOICES, default='auto')
+    # Unique index used to skip rows that were already imported
+    fingerprint = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.date} {self.description} - {self.amount}"
+
+    def save(self, *args, **kwargs):
+        # Bulk imports set fingerprints themselves; single saves take the first free ordinal
+        if isinstance(self.date, str):
+            self.date = parse_date(self.date)
+        candidates = [
+            transaction_fingerprint(self.user_id, self.date, self.amount, self.description, ordinal)
+            for ordinal in range(MAX_FINGERPRINT_ORDINAL)
+        ]
+        if self.fingerprint not in candidates:
+            taken = set(Transaction.objects.filter(fingerprint__in=candidates)
+                        .exclude(pk=self.pk).values_list('fingerprint', flat=True))
+            self.fingerprint = next((fp for fp in candidates if fp not in taken), None)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        ordering = ['-date']
+        indexes = [models.Index(fields=['user', 'date'])]
+
+
+class DetectionCheckpoint(models.Model):
+    """
+    Where recurring-payment and anomaly detection stopped for a user, plus the
+    running category x month totals the anomaly z-scores are computed from.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='detection_checkpoint')
+    last_transaction_id = models.BigIntegerField(default=0)
+    month_totals = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} @ {self.last_transaction_id}"
+
+
+class RecurringPayment(models.Model):
+    KIND_CHOICES = [
+        ('subscription', 'Subscription'),
+        ('emi', 'EMI / Loan'),
+        ('recurring', 'Recurring'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recurring_payments')
+    merchant = models.CharField(max_length=255)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='recurring')
+    period = models.CharField(max_length=20)
+    period_days = models.PositiveIntegerField()
+    occurrences = models.PositiveIntegerField()
+    first_date = models.DateField()
+    last_date = models.DateField()
+    next_expected = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.merchant} {self.amount} every {self.period_days} days"
+
+    class Meta:
+        ordering = ['next_expected']
+        unique_together = ['user', 'merchant', 'amount']
+
+
+class SpendingAnomaly(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='spending_anomalies')
+    category = models.CharField(max_length=100)
+    month = models.CharField(max_length=7)  # YYYY-MM
+    total = models.DecimalField(max_digits=12, decimal_places=2)
+    baseline = models.FloatField()
+    z_score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.category} {self.month} (z={self.z_score:.1f})"
+
+    class Meta:
+        ordering = ['-month', '-z_score']
+        verbose_name_plural = 'Spending anomalies'
+        unique_together = ['user', 'category', 'month']
+
+
+class TransactionArchive(models.Model):
+    """
+    One user's archived year: the compressed columnar file holding the rows that
+    were moved out of the Transaction table, and the date they were archived up to.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transaction_archives')
+    year = models.PositiveIntegerField()
+    path = models.CharField(max_length=500)
+    row_count = models.PositiveIntegerField(default=0)
+    archived_before = models.DateField()  # Every row dated before this was moved out
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} {self.year} ({self.row_count} rows)"
+
+    class Meta:
+        ordering = ['-year']
+        unique_together = ['user', 'year']
+
+
+class YearlyRollup(models.Model):
+    """
+    Precomputed month x category totals of archived transactions, merged into
+    the summary endpoints so totals still cover the archived years.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='yearly_rollups')
+    year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.CharField(max_length=100, null=True, blank=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2)
+    count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} {self.category}: {self.total}"
+
+    class Meta:
+        ordering = ['year', 'month']
+        unique_together = ['user', 'year', 'month', 'category']
+
+
+class CategorizationRule(models.Model):
+    """
+    A user's rule assigning a category to imported rows. A row matches when its
+    description contains `keyword` and matches `pattern` (either may be blank) and
+    its amount lies in [min_amount, max_amount]. Higher priority rules win.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='categorization_rules')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='rules')
+    keyword = models.CharField(max_length=100, blank=True, default='')
+    pattern = models.CharField(max_length=255, blank=True, default='')  # Case-insensitive regex
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    max_amount = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    priority = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.keyword or self.pattern} -> {self.category}"
+
+    class Meta:
+        ordering = ['-priority', 'id']
+
+
+class RecategorizationJob(models.Model):
+    """
+    Re-categorization of one user's transactions, processed in id order.
+    `last_id` is the last transaction handled, so an interrupted job resumes there.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recategorization_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    only_uncategorized = models.BooleanField(default=False)
+    overwrite_user_categories = models.BooleanField(default=False)
+    last_id = models.BigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} {self.status} {self.processed}/{self.total}"
+
+    class Meta:
+        ordering = ['-created_at']
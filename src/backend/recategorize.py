@@ -0,0 +1,168 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .categorization import categories_for, categorize_rows
+from .detection import run_detection
+from .models import RecategorizationJob, Transaction
+from .versions import bump_data_version
+from src.utils.config_utils import read_category_config
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 2000
+ACTIVE_STATUSES = ['pending', 'running']
+UNKNOWN_CATEGORY = 'Unknown'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _abandoned():
+    """
+    Running jobs that saved no progress within the heartbeat window: run_job
+    saves with every chunk, so their worker was stopped.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'RECATEGORIZE_HEARTBEAT_SECONDS', 300))
+    return Q(status='running', updated_at__lt=cutoff)
+
+
+def create_job(user, only_uncategorized=False, overwrite_user_categories=False):
+    """
+    Return the user's unfinished job, abandoned ones included so start_job can
+    resume them, or a new pending one sized to their transactions.
+    """
+    job = RecategorizationJob.objects.filter(user=user, status__in=ACTIVE_STATUSES).first()
+    if job is not None:
+        return job
+    return RecategorizationJob.objects.create(
+        user=user,
+        only_uncategorized=only_uncategorized,
+        overwrite_user_categories=overwrite_user_categories,
+        total=_transactions(user, only_uncategorized, overwrite_user_categories).count(),
+    )
+
+
+def _transactions(user, only_uncategorized, overwrite_user_categories):
+    queryset = Transaction.objects.filter(user=user)
+    if only_uncategorized:
+        queryset = queryset.filter(Q(category__isnull=True) | Q(category__name=UNKNOWN_CATEGORY))
+    if not overwrite_user_categories:
+        queryset = queryset.exclude(category_source='user')
+    return queryset
+
+
+def recategorize_chunk(job, rows, category_map, known):
+    """
+    Recompute the categories of one chunk of (id, description, amount, category)
+    rows and write back only the changed ones. Returns the number changed.
+
+    A row keeps its category when neither a rule nor the dictionary knows it:
+    falling back to Unknown would only throw information away.
+    """
+    batch = [
+        {'id': row_id, 'description': description, 'amount': amount, 'category': None, 'current': current}
+        for row_id, description, amount, current in rows
+    ]
+    categorize_rows(job.user, batch, category_map)
+    changed = [
+        row for row in batch
+        if row['category'] != row['current'] and not (row['category'] == UNKNOWN_CATEGORY and row['current'])
+    ]
+    if not changed:
+        return 0
+
+    categories_for(job.user, {row['category'] for row in changed}, known)
+    now = timezone.now()
+    Transaction.objects.bulk_update(
+        [Transaction(id=row['id'], category=known[row['category']], category_source='auto', updated_at=now)
+         for row in changed],
+        ['category', 'category_source', 'updated_at'],
+    )
+    return len(changed)
+
+
+def run_job(job, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """
+    Stream the job's transactions in id-ordered chunks from `last_id` on. Each
+    chunk's updates and the job's progress are committed together, so the job
+    can be stopped at any point and resumed by running it again.
+    `on_chunk(job)` is called after every committed chunk.
+    """
+    category_map = read_category_config()
+    known = {}
+    job.status = 'running'
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+    queryset = _transactions(job.user, job.only_uncategorized, job.overwrite_user_categories).order_by('id')
+    try:
+        while True:
+            rows = list(queryset.filter(id__gt=job.last_id).values_list(
+                'id', 'description', 'amount', 'category__name'
+            )[:chunk_size])
+            if not rows:
+                break
+
+            with transaction.atomic():
+                changed = recategorize_chunk(job, rows, category_map, known)
+                job.last_id = rows[-1][0]
+                job.processed += len(rows)
+                job.changed += changed
+                job.save(update_fields=['last_id', 'processed', 'changed', 'updated_at'])
+            if changed:
+                # bulk_update skips signals
+                bump_data_version(job.user_id)
+            if on_chunk is not None:
+                on_chunk(job)
+
+        if job.changed:
+            # Monthly category totals behind the anomaly z-scores moved with the rows
+            run_detection(job.user, full=True)
+    except Exception as e:
+        logger.exception("Re-categorization job %s failed", job.pk)
+        job.status = 'failed'
+        job.error = str(e)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+        return job
+
+    job.status = 'done'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at', 'updated_at'])
+    return job
+
+
+def _run_in_background(job_id):
+    try:
+        run_job(RecategorizationJob.objects.select_related('user').get(pk=job_id))
+    finally:
+        close_old_connections()
+
+
+def start_job(job):
+    """
+    Run a pending or abandoned job on the background thread, from its `last_id`.
+    A job still running elsewhere is left alone.
+    """
+    global _executor
+    # update() skips auto_now: refreshing the heartbeat here keeps a second request from claiming it too
+    now = timezone.now()
+    claimed = RecategorizationJob.objects.filter(Q(status='pending') | _abandoned(), pk=job.pk).update(
+        status='running', updated_at=now
+    )
+    if not claimed:
+        return False
+    job.status = 'running'
+    job.updated_at = now
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recategorize')
+    # Start after commit so the thread sees the job row
+    transaction.on_commit(lambda: _executor.submit(_run_in_background, job.pk))
+    return True
@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to DRF's encoder
+    orjson = None
+
+
+def _orjson_default(obj):
+    # Match DRF's JSONEncoder: decimals as numbers, lazy strings and the rest as text
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed. Pretty-printed output
+    (browsable API, ?indent=) still goes through DRF's encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_orjson_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def to_columnar(data):
+    """
+    Turn a list of row dicts into one array per field: {'count': n, 'columns': {...}}.
+    Dicts holding such lists (analytics sections) are converted value by value;
+    anything else is returned unchanged.
+    """
+    if isinstance(data, list):
+        if not data or not all(isinstance(row, dict) for row in data):
+            return data
+        fields = list(data[0])
+        return {'count': len(data), 'columns': {field: [row.get(field) for row in data] for field in fields}}
+    if isinstance(data, dict) and 'columns' not in data:
+        return {key: to_columnar(value) for key, value in data.items()}
+    return data
+
+
+class ColumnarRenderer(BaseRenderer):
+    """
+    Opt-in columnar JSON (?format=columnar): one array per field, no repeated keys.
+    """
+    media_type = 'application/json'
+    format = 'columnar'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return FastJSONRenderer().render(to_columnar(data), accepted_media_type, renderer_context)
+
+
+def columnar_rows(queryset, fields):
+    '''
+
+    :param queryset: rows to return
+    :param fields: output name -> ORM lookup
+    :return: {'count': n, 'columns': {name: [values]}} read with values_list, without model instances
+    '''
+    rows = list(queryset.values_list(*fields.values()))
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in fields]
+    return {'count': len(rows), 'columns': dict(zip(fields, columns))}
+
+
+class ColumnarListMixin:
+    """
+    For ?format=columnar, list() reads `columnar_fields` (output name -> ORM lookup)
+    straight from the database with values_list, skipping per-object serializers.
+    """
+    columnar_fields = {}
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if not self.columnar_fields or getattr(renderer, 'format', None) != 'columnar':
+            return super().list(request, *args, **kwargs)
+
+        return Response(columnar_rows(self.filter_queryset(self.get_queryset()), self.columnar_fields))
@@ -0,0 +1,127 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+
+from .models import Expense, Transaction
+
+# Models whose descriptions get a full-text index
+SEARCHABLE_MODELS = [Expense, Transaction]
+
+# Shortest term a trigram index can match; shorter ones are matched by a scan
+TRIGRAM_LENGTH = 3
+
+# (database alias, table) -> whether the SQLite FTS5 trigram table exists
+_fts_tables = {}
+
+
+def search_terms(text):
+    '''
+
+    :param text: raw search box input
+    :return: lower-cased word tokens; each one is matched anywhere in the description
+    '''
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def _sqlite_statements(table):
+    fts = f'{table}_fts'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5(description, content='{table}', content_rowid='id', "
+        f"tokenize='trigram')",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        # Triggers keep the index in sync with every write path, bulk_create and raw deletes included
+        f"CREATE TRIGGER {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description); END",
+        f"CREATE TRIGGER {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, description) VALUES ('delete', old.id, old.description); END",
+        f"CREATE TRIGGER {fts}_update AFTER UPDATE OF description ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, description) VALUES ('delete', old.id, old.description); "
+        f"INSERT INTO {fts}(rowid, description) VALUES (new.id, new.description); END",
+    ]
+
+
+def _sqlite_drop_statements(table):
+    # Tables indexed by an older version of this module, with word tokens that miss infixes
+    fts = f'{table}_fts'
+    return [f"DROP TRIGGER IF EXISTS {fts}_{event}" for event in ('insert', 'delete', 'update')] + [
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def _sqlite_has_fts(connection, table):
+    key = (connection.alias, table)
+    if key not in _fts_tables:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = %s", [f'{table}_fts'])
+            row = cursor.fetchone()
+        _fts_tables[key] = row is not None and 'trigram' in row[0]
+    return _fts_tables[key]
+
+
+def install_search_indexes(using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate handler creating the description indexes: an FTS5 trigram
+    table kept in sync by triggers on SQLite, a pg_trgm GIN index on PostgreSQL.
+    Other backends, and SQLite builds without FTS5 or its trigram tokenizer
+    (3.34+), keep unindexed substring search.
+    """
+    connection = connections[using]
+    for model in SEARCHABLE_MODELS:
+        table = model._meta.db_table
+        if connection.vendor == 'sqlite':
+            if _sqlite_has_fts(connection, table):
+                continue
+            try:
+                with transaction.atomic(using=using), connection.cursor() as cursor:
+                    for statement in _sqlite_drop_statements(table) + _sqlite_statements(table):
+                        cursor.execute(statement)
+                _fts_tables[(using, table)] = True
+            except DatabaseError:
+                # SQLite compiled without FTS5 or older than the trigram tokenizer
+                _fts_tables[(using, table)] = False
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(f"DROP INDEX IF EXISTS {table}_description_fts")
+                # On the expression icontains filters by, so the planner can use it for LIKE '%term%'
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_description_trgm "
+                    f"ON {table} USING gin (UPPER(description) gin_trgm_ops)"
+                )
+
+
+def search_queryset(queryset, text):
+    """
+    Filter a Transaction or Expense queryset to descriptions containing every
+    search term, anywhere in a word, using the trigram index when there is one.
+
+    The match is a predicate on the queryset's own rows, next to its other
+    filters such as the user: PostgreSQL combines the trigram index with them,
+    and SQLite probes the FTS5 index once per remaining row instead of
+    collecting the matches of every user first. Terms shorter than a trigram
+    are matched by scanning the rows the other filters leave.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    quote = connection.ops.quote_name
+    if connection.vendor == 'sqlite' and _sqlite_has_fts(connection, table):
+        indexed = [term for term in terms if len(term) >= TRIGRAM_LENGTH]
+        terms = [term for term in terms if len(term) < TRIGRAM_LENGTH]
+        if indexed:
+            match = ' AND '.join(f'"{term}"' for term in indexed)
+            fts = f'{table}_fts'
+            queryset = queryset.filter(RawSQL(
+                f"EXISTS (SELECT 1 FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = {quote(table)}.{quote('id')})",
+                [match], output_field=BooleanField(),
+            ))
+
+    # On PostgreSQL the trigram index on UPPER(description) serves these
+    for term in terms:
+        queryset = queryset.filter(description__icontains=term)
+    return queryset
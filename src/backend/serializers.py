@@ -1,7 +1,18 @@
+import re
+
 from rest_framework import serializers
-from .models import Category, Expense, Transaction
+from .models import Category, Expense, Transaction, RecurringPayment, SpendingAnomaly, CategorizationRule
+from .models import RecategorizationJob
 from django.contrib.auth.models import User
 
+# Rule patterns run in the worker on every imported row, so they are kept short
+MAX_PATTERN_LENGTH = 100
+# A quantified group that contains a quantifier, e.g. (a+)+ or (?:\w*x)*, can backtrack exponentially
+NESTED_QUANTIFIER = re.compile(
+    r'\((?:\?[^\w(]?[a-zA-Z]*:?)?(?:[^()\\]|\\.)*(?:[+*]|\{\d+(?:,\d*)?\})(?:[^()\\]|\\.)*\)'
+    r'(?:[+*]|\{\d+(?:,\d*)?\})'
+)
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -48,4 +59,66 @@ class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = ['id', 'date', 'description', 'amount', 'category', 'category_name', 'category_color']
-        read_only_fields = ['user']
\ No newline at end of file
+        read_only_fields = ['user']
+
+
+class RecurringPaymentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringPayment
+        fields = ['id', 'merchant', 'amount', 'kind', 'period', 'period_days', 'occurrences',
+                  'first_date', 'last_date', 'next_expected']
+
+
+class SpendingAnomalySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SpendingAnomaly
+        fields = ['id', 'category', 'month', 'total', 'baseline', 'z_score']
+
+
+class CategorizationRuleSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = CategorizationRule
+        fields = ['id', 'category', 'category_name', 'keyword', 'pattern', 'min_amount', 'max_amount', 'priority']
+
+    def validate_category(self, category):
+        if category.user_id != self.context['request'].user.pk:
+            raise serializers.ValidationError("Unknown category")
+        return category
+
+    def validate_pattern(self, pattern):
+        if len(pattern) > MAX_PATTERN_LENGTH:
+            raise serializers.ValidationError(f"Patterns are limited to {MAX_PATTERN_LENGTH} characters")
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise serializers.ValidationError(f"Invalid regular expression: {e}")
+        if NESTED_QUANTIFIER.search(pattern):
+            raise serializers.ValidationError("Nested quantifiers such as (a+)+ are not allowed")
+        return pattern
+
+    def validate(self, data):
+        keyword = data.get('keyword', getattr(self.instance, 'keyword', ''))
+        pattern = data.get('pattern', getattr(self.instance, 'pattern', ''))
+        if not keyword and not pattern:
+            raise serializers.ValidationError("A rule needs a keyword or a pattern")
+        min_amount = data.get('min_amount', getattr(self.instance, 'min_amount', None))
+        max_amount = data.get('max_amount', getattr(self.instance, 'max_amount', None))
+        if min_amount is not None and max_amount is not None and min_amount > max_amount:
+            raise serializers.ValidationError("min_amount can't be greater than max_amount")
+        return data
+
+
+class RecategorizationJobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RecategorizationJob
+        fields = ['id', 'status', 'only_uncategorized', 'overwrite_user_categories', 'total', 'processed', 'changed',
+                  'progress', 'error', 'created_at', 'updated_at', 'finished_at']
+
+    def get_progress(self, obj):
+        if obj.status == 'done':
+            return 100.0
+        return round(100.0 * obj.processed / obj.total, 1) if obj.total else 0.0
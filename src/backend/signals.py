@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import AUTH_NAMESPACE, token_cache
+from .models import Category, CategorizationRule, Transaction
+from .versions import bump_data_version
+
+
+@receiver([post_save, post_delete], sender=Transaction)
+def transaction_changed(sender, instance, **kwargs):
+    # bulk_create, bulk_update and queryset.update() skip signals; their callers bump the version
+    bump_data_version(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=CategorizationRule)
+@receiver([post_save, post_delete], sender=Category)
+def rules_changed(sender, instance, **kwargs):
+    # Compiled matchers hold category names, so renaming a category invalidates them too
+    bump_data_version(instance.user_id, namespace='rules')
+    if sender is Category:
+        # So do cached transaction frames, and deleting a category uncategorizes its rows
+        bump_data_version(instance.user_id)
+
+
+@receiver(pre_save, sender=User)
+def password_changing(sender, instance, **kwargs):
+    # set_password() keeps the raw password in _password until the user is saved
+    if instance.pk and getattr(instance, '_password', None) is not None:
+        Token.objects.filter(user_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Cached token logins carry the user as of login: deactivation must reach every worker
+    bump_data_version(instance.pk, namespace=AUTH_NAMESPACE)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    token_cache.discard(instance.key)
+    bump_data_version(instance.user_id, namespace=AUTH_NAMESPACE)
@@ -0,0 +1,10 @@
+"""
+ASGI config for spend_analysis project.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.backend.spend_analysis.settings')
+
+application = get_asgi_application()
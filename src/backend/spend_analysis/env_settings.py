@@ -23,9 +23,41 @@ DB_PASSWORD = get_env_variable('DB_PASSWORD', '')
 DB_HOST = get_env_variable('DB_HOST', '')
 DB_PORT = get_env_variable('DB_PORT', '')
 
+# Read replica for analytics queries (leave DB_REPLICA_NAME empty to disable)
+DB_REPLICA_NAME = get_env_variable('DB_REPLICA_NAME', '')
+DB_REPLICA_HOST = get_env_variable('DB_REPLICA_HOST', DB_HOST)
+DB_REPLICA_PORT = get_env_variable('DB_REPLICA_PORT', DB_PORT)
+REPLICA_STICKY_SECONDS = int(get_env_variable('REPLICA_STICKY_SECONDS', '10'))
+
+# Cache shared by all workers (data versions); use Redis in production
+CACHE_BACKEND = get_env_variable('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = get_env_variable('CACHE_LOCATION', '')
+ANALYTICS_CACHE_SIZE = int(get_env_variable('ANALYTICS_CACHE_SIZE', '128'))
+RULE_CACHE_SIZE = int(get_env_variable('RULE_CACHE_SIZE', '256'))
+TOKEN_CACHE_TTL = int(get_env_variable('TOKEN_CACHE_TTL', '30'))
+TOKEN_CACHE_SIZE = int(get_env_variable('TOKEN_CACHE_SIZE', '10000'))
+
+# Monthly category totals this many standard deviations above normal are flagged
+ANOMALY_Z_THRESHOLD = float(get_env_variable('ANOMALY_Z_THRESHOLD', '3.0'))
+
+# Threads computing /dashboard/ sections concurrently (1 = sequential)
+DASHBOARD_WORKERS = int(get_env_variable('DASHBOARD_WORKERS', '4'))
+
+# A running re-categorization job with no progress saved for this many seconds was abandoned
+RECATEGORIZE_HEARTBEAT_SECONDS = int(get_env_variable('RECATEGORIZE_HEARTBEAT_SECONDS', '300'))
+
+# Transactions older than this many days are moved to compressed per-year archives
+ARCHIVE_AFTER_DAYS = int(get_env_variable('ARCHIVE_AFTER_DAYS', '730'))
+ARCHIVE_ROOT = get_env_variable('ARCHIVE_ROOT', '')
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = get_env_variable('CORS_ALLOW_ALL_ORIGINS', 'True') == 'True'
 CORS_ALLOWED_ORIGINS = get_env_variable('CORS_ALLOWED_ORIGINS', '').split(',') if get_env_variable('CORS_ALLOWED_ORIGINS') else []
 
+# Performance instrumentation
+PERF_INSTRUMENTATION = get_env_variable('PERF_INSTRUMENTATION', 'False') == 'True'
+PERF_QUERY_THRESHOLD = int(get_env_variable('PERF_QUERY_THRESHOLD', '50'))
+PERF_HISTOGRAM_WINDOW = int(get_env_variable('PERF_HISTOGRAM_WINDOW', '1000'))
+
 # Frontend URL for redirects
 FRONTEND_URL = get_env_variable('FRONTEND_URL', 'http://localhost:3000')
\ No newline at end of file
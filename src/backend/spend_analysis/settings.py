@@ -3,8 +3,8 @@ Django settings for spend_analysis project.
 """
 import os
 from pathlib import Path
-import env_settings
-from env_settings import *
+from . import env_settings
+from .env_settings import *
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,11 +32,14 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     'src.backend',  # Your backend app
 ]
 
 MIDDLEWARE = [
+    'src.backend.middleware.PerformanceMiddleware',
+    'src.backend.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -47,7 +50,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'spend_analysis.urls'
+ROOT_URLCONF = 'src.backend.spend_analysis.urls'
 
 TEMPLATES = [
     {
@@ -65,7 +68,8 @@ TEMPLATES = [
     },
 ]
 
-WSGI_APPLICATION = 'spend_analysis.wsgi.application'
+WSGI_APPLICATION = 'src.backend.spend_analysis.wsgi.application'
+ASGI_APPLICATION = 'src.backend.spend_analysis.asgi.application'
 
 # Then replace your DATABASES configuration with this
 DATABASES = {
@@ -79,6 +83,50 @@ DATABASES = {
     }
 }
 
+# Analytics views read from this replica when it is configured
+REPLICA_DB_ALIAS = 'replica' if DB_REPLICA_NAME else None
+REPLICA_STICKY_SECONDS = REPLICA_STICKY_SECONDS  # Users stay on the primary this long after writing
+if DB_REPLICA_NAME:
+    DATABASES[REPLICA_DB_ALIAS] = {
+        'ENGINE': DB_ENGINE,
+        'NAME': DB_REPLICA_NAME,
+        'USER': DB_USER,
+        'PASSWORD': DB_PASSWORD,
+        'HOST': DB_REPLICA_HOST,
+        'PORT': DB_REPLICA_PORT,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['src.backend.db_router.AnalyticsReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+    }
+}
+
+# Number of per-user transaction frames each worker keeps for /analytics/
+ANALYTICS_CACHE_SIZE = ANALYTICS_CACHE_SIZE
+
+# Number of users' compiled categorization rules each worker keeps
+RULE_CACHE_SIZE = RULE_CACHE_SIZE
+
+# Seconds a validated API token is trusted without a database lookup, and how many each worker keeps.
+# Without a shared CACHE_BACKEND a revoked token stays usable on other workers for up to TOKEN_CACHE_TTL
+TOKEN_CACHE_TTL = TOKEN_CACHE_TTL
+TOKEN_CACHE_SIZE = TOKEN_CACHE_SIZE
+
+# z-score above which a category's monthly total is reported as a spending spike
+ANOMALY_Z_THRESHOLD = ANOMALY_Z_THRESHOLD
+
+# Each dashboard section runs on its own thread and database connection
+DASHBOARD_WORKERS = DASHBOARD_WORKERS
+
+# Running re-categorization jobs save progress with every chunk; one silent for longer was left by a
+# stopped worker, and the next request for that user resumes it
+RECATEGORIZE_HEARTBEAT_SECONDS = RECATEGORIZE_HEARTBEAT_SECONDS
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -113,13 +161,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
 REST_FRAMEWORK = {
+    # Tokens from /auth/login/; validated tokens are cached per worker (TOKEN_CACHE_TTL)
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'src.backend.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.BasicAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson-backed JSON when orjson is installed; DRF's encoder otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'src.backend.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 # CORS settings
@@ -128,6 +182,15 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:3000",
 ]
 
+# Per-request performance instrumentation (Server-Timing headers, endpoint stats)
+PERF_INSTRUMENTATION = PERF_INSTRUMENTATION
+PERF_QUERY_THRESHOLD = PERF_QUERY_THRESHOLD  # Requests above this query count are flagged as N+1
+PERF_HISTOGRAM_WINDOW = PERF_HISTOGRAM_WINDOW
+
 # File upload settings
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Per-user, per-year archives written by the archive_transactions command
+ARCHIVE_AFTER_DAYS = ARCHIVE_AFTER_DAYS
+ARCHIVE_ROOT = ARCHIVE_ROOT or os.path.join(BASE_DIR, 'archive')
@@ -0,0 +1,13 @@
+"""
+URL configuration for spend_analysis project.
+"""
+from django.contrib import admin
+from django.urls import path, include
+from django.views.generic import TemplateView
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('api/', include('src.backend.urls')),
+    path('auth/', include('src.backend.auth_urls')),
+    path('', TemplateView.as_view(template_name='index.html')),
+]
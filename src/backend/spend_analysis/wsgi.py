@@ -0,0 +1,10 @@
+"""
+WSGI config for spend_analysis project.
+"""
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.backend.spend_analysis.settings')
+
+application = get_wsgi_application()
@@ -0,0 +1,538 @@
+import io
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .analytics import frame_cache
+from .archive import archive_user
+from .categorization import matcher_cache
+from .db_router import STICKY_COOKIE, is_pinned_to_primary, pin_to_primary
+from .detection import run_detection
+from .importer import import_statement
+from .models import Category, CategorizationRule, Expense, RecurringPayment, SpendingAnomaly, Transaction
+from .models import RecategorizationJob, YearlyRollup
+from .recategorize import create_job, run_job, start_job
+from .search import search_queryset
+from src.utils.importtime_utils import STARTUP_TARGETS, measure_startup
+from src.utils.statement_readers import XlsReader, XlsxReader
+
+if 'replica' not in connections:
+    # What DB_REPLICA_NAME configures: a test mirror of the primary on its own connection. The runner
+    # sets databases up before any test class runs; only ReplicaRoutingTests routes reads to it
+    connections.settings['replica'] = {
+        **connections['default'].settings_dict,
+        'TEST': {**connections['default'].settings_dict['TEST'], 'MIRROR': 'default'},
+    }
+
+SMALL = {'categories': 3, 'transactions': 10, 'expenses': 10}
+LARGE = {'categories': 12, 'transactions': 3000, 'expenses': 1000}
+UPLOAD_ROWS = {'small': 10, 'large': 400}
+
+# Wall-time bound of one request against the large dataset
+MAX_SECONDS = 2.0
+
+# Import-time budget of each startup target; the CLI and WSGI app must not load pandas
+STARTUP_BUDGET_MS = {'cli': 300, 'wsgi': 2000}
+LAZY_MODULES = ('pandas', 'numpy')
+
+# Endpoint name -> (URL name, query string)
+ENDPOINTS = {
+    'transactions': ('transaction-list', ''),
+    'transactions_columnar': ('transaction-list', 'format=columnar'),
+    'expenses': ('expense-list', ''),
+    'expenses_search': ('expense-list', 'search=store'),
+    'expense_summary': ('expense-summary', 'start_date=2020-01-01'),
+    'expense_monthly_summary': ('expense-monthly-summary', ''),
+    'categories': ('category-list', ''),
+    'rules': ('rule-list', ''),
+    'spending_summary': ('spending_summary', ''),
+    'monthly_spending': ('monthly_spending', ''),
+    'dashboard': ('dashboard', ''),
+    'analytics': ('analytics', ''),
+    'insights': ('insights', ''),
+    'recategorize': ('recategorize', ''),
+}
+
+
+def seed_user(username, size, rng):
+    user = User.objects.create_user(username=username, password='test-password')
+    categories = Category.objects.bulk_create([
+        Category(user=user, name=f'Category {index}') for index in range(size['categories'])
+    ])
+    today = date.today()
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user,
+            date=today - timedelta(days=rng.randint(0, 700)),
+            description=f'STORE {rng.randint(1, 300)} PURCHASE',
+            amount=Decimal(f'{rng.uniform(1, 2000):.2f}'),
+            category=rng.choice(categories),
+        )
+        for _ in range(size['transactions'])
+    ])
+    Expense.objects.bulk_create([
+        Expense(
+            user=user,
+            date=today - timedelta(days=rng.randint(0, 200)),
+            description=f'Store {rng.randint(1, 300)} purchase',
+            amount=Decimal(f'{rng.uniform(1, 500):.2f}'),
+            category=rng.choice(categories),
+        )
+        for _ in range(size['expenses'])
+    ])
+    CategorizationRule.objects.bulk_create([
+        CategorizationRule(user=user, category=category, keyword=f'store {index}')
+        for index, category in enumerate(categories)
+    ])
+    RecurringPayment.objects.bulk_create([
+        RecurringPayment(user=user, merchant=f'merchant {index}', amount=10 + index, period='monthly',
+                         period_days=30, occurrences=3, first_date=today, last_date=today, next_expected=today)
+        for index in range(size['categories'])
+    ])
+    SpendingAnomaly.objects.bulk_create([
+        SpendingAnomaly(user=user, category=category.name, month=f'2024-{index + 1:02d}', total=100,
+                        baseline=10, z_score=4)
+        for index, category in enumerate(categories)
+    ])
+    return user
+
+
+def statement_csv(rows, rng):
+    lines = ['date,description,amount']
+    for _ in range(rows):
+        day = date.today() - timedelta(days=rng.randint(0, 300))
+        lines.append(f'{day:%Y-%m-%d},UPLOAD {rng.randint(1, 10 ** 6)},{rng.uniform(1, 900):.2f}')
+    return '\n'.join(lines).encode('utf-8')
+
+
+# Dashboard sections run inline so every query lands on the test connection
+@override_settings(DASHBOARD_WORKERS=1, PERF_INSTRUMENTATION=False)
+class QueryCountTests(TestCase):
+    """
+    Every endpoint must issue the same number of queries for a small and a large
+    dataset, and answer within MAX_SECONDS for the large one.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        cls.small = seed_user('small', SMALL, rng)
+        cls.large = seed_user('large', LARGE, rng)
+
+    def setUp(self):
+        frame_cache.clear()
+        matcher_cache.clear()
+
+    def request(self, user, method, url, **kwargs):
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            elapsed = time.perf_counter() - start
+        self.assertLess(response.status_code, 400, f'{url}: {response.content[:300]}')
+        return [query['sql'] for query in queries.captured_queries], elapsed
+
+    def test_get_endpoints(self):
+        for name, (url_name, query_string) in ENDPOINTS.items():
+            url = reverse(url_name) + (f'?{query_string}' if query_string else '')
+            with self.subTest(endpoint=name):
+                frame_cache.clear()
+                small_queries, _ = self.request(self.small, 'get', url)
+                frame_cache.clear()
+                large_queries, elapsed = self.request(self.large, 'get', url)
+                self.assertEqual(len(small_queries), len(large_queries),
+                                 f'{name} query count grows with data size')
+                self.assertLess(elapsed, MAX_SECONDS, f'{name} took {elapsed:.2f}s')
+
+    def test_upload_csv(self):
+        # Start from a detection checkpoint so both uploads are scanned incrementally
+        run_detection(self.large)
+        rng = random.Random(7)
+        counts = {}
+        for size, rows in UPLOAD_ROWS.items():
+            matcher_cache.clear()
+            upload = SimpleUploadedFile('statement.csv', statement_csv(rows, rng), content_type='text/csv')
+            queries, elapsed = self.request(self.large, 'post', reverse('upload_csv'), data={'file': upload},
+                                            format='multipart')
+            # bulk_create splits inserts by the backend's parameter limit; everything else is per batch
+            counts[size] = len([sql for sql in queries if not sql.lstrip().upper().startswith('INSERT')])
+            self.assertLess(len(queries), rows / 5 + 30, f'upload of {rows} rows issues per-row queries')
+            self.assertLess(elapsed, MAX_SECONDS)
+        self.assertEqual(counts['small'], counts['large'], 'upload query count grows with row count')
+
+
+class RecategorizationTests(TestCase):
+    """
+    A re-categorization job must not lose information: categories the user
+    supplied survive unless overwriting is asked for, and rows nothing
+    recognizes keep their category instead of dropping to Unknown.
+    """
+
+    STATEMENT = (
+        'date,description,amount,category\n'
+        '2024-01-05,RENT JANUARY,25000,Housing\n'
+        '2024-01-06,AMAZON PRIME,1499,Subscriptions\n'
+        '2024-01-07,AMAZON ORDER,900,\n'
+        '2024-01-08,CORNER GIFT SHOP,450,\n'
+    )
+
+    def setUp(self):
+        matcher_cache.clear()
+        self.user = User.objects.create_user(username='recategorize', password='test-password')
+        gifts = Category.objects.create(user=self.user, name='Gifts')
+        self.rule = CategorizationRule.objects.create(user=self.user, category=gifts, keyword='gift shop')
+        import_statement(self.user, io.BytesIO(self.STATEMENT.encode('utf-8')), filename='statement.csv')
+
+    def categories(self):
+        return dict(Transaction.objects.filter(user=self.user).values_list('description', 'category__name'))
+
+    def test_keeps_user_supplied_and_unrecognized_categories(self):
+        self.assertEqual(self.categories(), {
+            'RENT JANUARY': 'Housing', 'AMAZON PRIME': 'Subscriptions',
+            'AMAZON ORDER': 'Shopping', 'CORNER GIFT SHOP': 'Gifts',
+        })
+        # Without the rule the dictionary doesn't know the gift shop
+        self.rule.delete()
+        job = run_job(create_job(self.user))
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.changed, 0)
+        self.assertEqual(self.categories()['CORNER GIFT SHOP'], 'Gifts')
+        self.assertEqual(self.categories()['RENT JANUARY'], 'Housing')
+
+    def test_overwrite_user_categories(self):
+        job = run_job(create_job(self.user, overwrite_user_categories=True))
+        self.assertEqual(job.changed, 1)
+        categories = self.categories()
+        self.assertEqual(categories['AMAZON PRIME'], 'Shopping')
+        # Unknown to the dictionary, so still not replaced
+        self.assertEqual(categories['RENT JANUARY'], 'Housing')
+
+    def test_abandoned_job_is_resumed(self):
+        first_id = Transaction.objects.filter(user=self.user).order_by('id').values_list('id', flat=True)[0]
+        job = create_job(self.user, overwrite_user_categories=True)
+        RecategorizationJob.objects.filter(pk=job.pk).update(status='running', last_id=first_id, processed=1)
+
+        # Still within the heartbeat window: another worker may be running it
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertFalse(start_job(create_job(self.user)))
+        self.assertEqual(callbacks, [])
+
+        RecategorizationJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        job = create_job(self.user)
+        self.assertEqual(job.status, 'running')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(start_job(job))
+        self.assertEqual(len(callbacks), 1)
+        # Claimed, so not picked up twice
+        self.assertFalse(start_job(create_job(self.user)))
+
+        job = run_job(job)
+        self.assertEqual((job.status, job.processed), ('done', 4))
+
+
+class StatementReaderTests(TestCase):
+    """
+    The legacy balance sheet layout: a SRL NO, Tran Date, CHQNO, PARTICULARS,
+    DR, CR, BAL table sandwiched between two rows marked with a tab.
+    """
+
+    ROWS = [
+        ['ACCOUNT STATEMENT', None, None, None, None, None, None],
+        ['\t', None, None, None, None, None, None],
+        ['SRL NO', 'Tran Date', 'CHQNO', 'PARTICULARS', 'DR', 'CR', 'BAL'],
+        [1, '01-04-2020', None, 'ZOMATO ORDER', 350.0, None, 9650.0],
+        [2, '02-04-2020', '000123', 'SALARY CREDIT', None, 50000.0, 59650.0],
+        ['\t', None, None, None, None, None, None],
+        ['CLOSING BALANCE', None, None, None, None, None, 59650.0],
+        ['SUMMARY', '30-04-2020', None, 'TOTAL DEBITS', 350.0, None, None],
+    ]
+
+    def test_legacy_layout(self):
+        # sheet_delimiter names the legacy marker column, as excel_utils passes it; the marker is the tab
+        for reader_class in (XlsReader, XlsxReader):
+            with self.subTest(reader=reader_class.name):
+                rows = list(reader_class(sheet_delimiter='----------------------').iter_table(self.ROWS))
+                self.assertEqual([(row['date'], row['description'], row['amount']) for row in rows], [
+                    (date(2020, 4, 1), 'ZOMATO ORDER', 350.0),
+                    (date(2020, 4, 2), 'SALARY CREDIT', -50000.0),
+                ])
+
+    def test_keep_columns(self):
+        rows = list(XlsReader(sheet_delimiter='\t', keep_columns=True).iter_table(self.ROWS))
+        self.assertEqual(rows[1]['columns'], {
+            'SRL NO': 2, 'Tran Date': '02-04-2020', 'CHQNO': '000123', 'PARTICULARS': 'SALARY CREDIT',
+            'DR': None, 'CR': 50000.0, 'BAL': 59650.0,
+        })
+
+
+class DataVersionTests(TestCase):
+    """
+    An evicted version key must not come back as a version a cached frame was built from.
+    """
+
+    def test_eviction_then_write(self):
+        frame_cache.clear()
+        user = User.objects.create_user(username='versions', password='test-password')
+        Transaction.objects.create(user=user, date=date(2024, 1, 1), description='FIRST', amount=10)
+        self.assertEqual(len(frame_cache.get(user.pk)), 1)
+
+        cache.clear()
+        Transaction.objects.create(user=user, date=date(2024, 1, 2), description='SECOND', amount=20)
+        self.assertEqual(len(frame_cache.get(user.pk)), 2)
+
+
+class RulePatternTests(TestCase):
+    """
+    Rule patterns run during imports, so ones that can backtrack catastrophically are rejected.
+    """
+
+    def test_pattern_validation(self):
+        user = User.objects.create_user(username='rules', password='test-password')
+        category = Category.objects.create(user=user, name='Streaming')
+        client = APIClient()
+        client.force_authenticate(user)
+        for pattern, status_code in [('netflix|prime video', 201), ('(?:upi|neft)/\\d+', 201),
+                                     ('(a+)+$', 400), ('(?:\\w*x)*', 400), ('x' * 101, 400)]:
+            with self.subTest(pattern=pattern):
+                response = client.post(reverse('rule-list'), {'category': category.pk, 'pattern': pattern})
+                self.assertEqual(response.status_code, status_code, response.content)
+
+
+class ReplicaStickinessTests(TestCase):
+    """
+    The primary pin travels with the client, so any worker honours it.
+    """
+
+    def test_signed_pin_cookie(self):
+        response = HttpResponse()
+        pin_to_primary(response, 7)
+        request = RequestFactory().get('/api/summary/')
+        request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+        self.assertTrue(is_pinned_to_primary(request, 7))
+        self.assertFalse(is_pinned_to_primary(request, 8))
+
+        request.COOKIES[STICKY_COOKIE] = '7'
+        self.assertFalse(is_pinned_to_primary(request, 7))
+        with override_settings(REPLICA_STICKY_SECONDS=-1):
+            request.COOKIES[STICKY_COOKIE] = response.cookies[STICKY_COOKIE].value
+            self.assertFalse(is_pinned_to_primary(request, 7))
+
+
+@override_settings(REPLICA_DB_ALIAS='replica')
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Analytics reads go to the replica, while writes and the reads of a user who
+    just wrote go to the primary. Frames read from the replica are not cached.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        frame_cache.clear()
+        self.user = seed_user('replica', SMALL, random.Random(5))
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def query_counts(self, method, url, **kwargs):
+        """
+        Queries the request ran on (the primary, the replica).
+        """
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400)
+        return len(primary), len(replica)
+
+    def test_routing(self):
+        primary, replica = self.query_counts('get', reverse('analytics'))
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+        self.assertIsNone(frame_cache.lookup(self.user.pk))
+
+        primary, replica = self.query_counts('post', reverse('transaction-list'), data={
+            'date': '2024-05-01', 'description': 'NEW PURCHASE', 'amount': '12.50',
+        })
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+
+        # Pinned after the write: read from the primary, so the frame is cached
+        primary, replica = self.query_counts('get', reverse('analytics'))
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+        self.assertIsNotNone(frame_cache.lookup(self.user.pk))
+
+
+class AnomalyDetectionTests(TestCase):
+    """
+    A category that is flat every month must still be flagged when one month spikes.
+    """
+
+    def test_spike_over_flat_months(self):
+        user = User.objects.create_user(username='anomalies', password='test-password')
+        rent = Category.objects.create(user=user, name='Housing')
+        Transaction.objects.bulk_create([
+            Transaction(user=user, date=date(2024, month, 1), description=f'RENT {month}',
+                        amount=Decimal(9000 if month == 7 else 1000), category=rent)
+            for month in range(1, 9)
+        ])
+        run_detection(user)
+        self.assertEqual(list(SpendingAnomaly.objects.filter(user=user).values_list('category', 'month')),
+                         [('Housing', '2024-07')])
+
+    def test_credits_are_ignored(self):
+        user = User.objects.create_user(username='credits', password='test-password')
+        rent = Category.objects.create(user=user, name='Housing')
+        Transaction.objects.bulk_create([
+            Transaction(user=user, date=date(2024, month, 1), description='SALARY ACME', amount=Decimal(-50000))
+            for month in range(1, 9)
+        ] + [
+            Transaction(user=user, date=date(2024, month, 2), description=f'RENT {month}',
+                        amount=Decimal(9000 if month == 7 else 1000), category=rent)
+            for month in range(1, 9)
+        ] + [
+            # A refund must not net the spike away
+            Transaction(user=user, date=date(2024, 7, 20), description='RENT REFUND', amount=Decimal(-8000),
+                        category=rent),
+        ])
+        run_detection(user)
+        self.assertFalse(RecurringPayment.objects.filter(user=user, amount__lt=0).exists())
+        self.assertEqual(list(SpendingAnomaly.objects.filter(user=user).values_list('category', 'month', 'total')),
+                         [('Housing', '2024-07', Decimal('9000.00'))])
+
+
+@override_settings(PERF_INSTRUMENTATION=True)
+class DashboardInstrumentationTests(TransactionTestCase):
+    """
+    Queries of dashboard sections computed on pool threads count towards the request.
+    """
+
+    def query_count(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return response['Server-Timing'].split('desc="')[1].split(' ')[0]
+
+    def test_concurrent_sections_are_counted(self):
+        user = seed_user('dashboard', SMALL, random.Random(3))
+        with override_settings(DASHBOARD_WORKERS=1):
+            sequential = self.query_count(user)
+        with override_settings(DASHBOARD_WORKERS=4):
+            concurrent = self.query_count(user)
+        self.assertEqual(sequential, concurrent)
+
+
+class StartupTimeTests(SimpleTestCase):
+    """
+    CLI and WSGI startup must succeed without importing heavy libraries and stay
+    within the import-time budget.
+    """
+
+    def test_startup(self):
+        for target in STARTUP_TARGETS:
+            with self.subTest(target=target):
+                result = measure_startup(target)
+                self.assertEqual(result['returncode'], 0, f'{target} failed to start')
+                heavy = {entry[0] for entry in result['entries'] if entry[0].split('.')[0] in LAZY_MODULES}
+                self.assertFalse(heavy, f'{target} imports {sorted(heavy)[:5]} at startup')
+                self.assertLess(result['import_ms'], STARTUP_BUDGET_MS[target],
+                                f"{target} spends {result['import_ms']:.0f} ms importing")
+
+
+class SearchTests(TestCase):
+    """
+    Search matches any part of a word, stays within the queryset's rows and
+    follows updates and deletes through the index.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='search', password='test-password')
+        other = User.objects.create_user(username='search-other', password='test-password')
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, date=date(2024, 1, 1), description='NETFLIX SUBSCRIPTION', amount=649),
+            Transaction(user=self.user, date=date(2024, 1, 2), description='UBER TRIP', amount=250),
+            Transaction(user=other, date=date(2024, 1, 3), description='NETFLIX SUBSCRIPTION', amount=649),
+        ])
+
+    def search(self, text):
+        return sorted(search_queryset(Transaction.objects.filter(user=self.user), text)
+                      .values_list('description', flat=True))
+
+    def test_prefix_infix_and_sync(self):
+        self.assertEqual(self.search('netf'), ['NETFLIX SUBSCRIPTION'])
+        self.assertEqual(self.search('flix'), ['NETFLIX SUBSCRIPTION'])
+        self.assertEqual(self.search('flix scrip'), ['NETFLIX SUBSCRIPTION'])
+        self.assertEqual(self.search('tr'), ['UBER TRIP'])
+        self.assertEqual(self.search('flix uber'), [])
+
+        Transaction.objects.filter(user=self.user, description='UBER TRIP').update(description='OLA RIDE')
+        self.assertEqual(self.search('uber'), [])
+        self.assertEqual(self.search('ride'), ['OLA RIDE'])
+
+        Transaction.objects.filter(user=self.user, description='NETFLIX SUBSCRIPTION').delete()
+        self.assertEqual(self.search('flix'), [])
+
+
+class ArchiveTests(TestCase):
+    """
+    Archiving moves rows out of the table, and re-imported rows from archived
+    months are reported separately from duplicates.
+    """
+
+    STATEMENT = (
+        'date,description,amount\n'
+        '2022-03-04,OLD GROCERIES,120\n'
+        '2024-02-01,NEW GROCERIES,80\n'
+    )
+
+    def test_archive_and_reimport(self):
+        user = User.objects.create_user(username='archive', password='test-password')
+        with tempfile.TemporaryDirectory() as archive_root, override_settings(ARCHIVE_ROOT=archive_root):
+            self.assertEqual(import_statement(user, io.BytesIO(self.STATEMENT.encode('utf-8')),
+                                              filename='statement.csv'), (2, 0, 0))
+            self.assertEqual(archive_user(user, date(2023, 1, 1)), {2022: 1})
+        self.assertEqual(list(Transaction.objects.filter(user=user).values_list('description', flat=True)),
+                         ['NEW GROCERIES'])
+        self.assertEqual(YearlyRollup.objects.get(user=user).count, 1)
+
+        created, duplicates, archived = import_statement(user, io.BytesIO(self.STATEMENT.encode('utf-8')),
+                                                         filename='statement.csv')
+        self.assertEqual((created, duplicates, archived), (0, 1, 1))
+
+
+class CategoryChangeTests(TestCase):
+    """
+    Cached analytics frames hold category names, so renaming or deleting a category invalidates them.
+    """
+
+    def test_rename_then_analytics(self):
+        frame_cache.clear()
+        user = User.objects.create_user(username='rename', password='test-password')
+        food = Category.objects.create(user=user, name='Food')
+        Transaction.objects.create(user=user, date=date(2024, 1, 5), description='ZOMATO', amount=300, category=food)
+        client = APIClient()
+        client.force_authenticate(user)
+        url = reverse('analytics') + '?sections=category_month'
+        self.assertEqual(client.get(url).json()['category_month']['categories'], ['Food'])
+
+        response = client.put(reverse('category-detail', args=[food.pk]), {'name': 'Dining'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get(url).json()['category_month']['categories'], ['Dining'])
+        self.assertEqual(len(client.get(url + '&category=Dining').json()['category_month']['categories']), 1)
+
+        client.delete(reverse('category-detail', args=[food.pk]))
+        self.assertEqual(client.get(url).json()['category_month']['categories'], ['Unknown'])
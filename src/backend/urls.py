@@ -1,10 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.generic import TemplateView
 
 from . import views
 
@@ -12,19 +10,21 @@ router = DefaultRouter()
 router.register(r'categories', views.CategoryViewSet, basename='category')
 router.register(r'expenses', views.ExpenseViewSet, basename='expense')
 router.register(r'transactions', views.TransactionViewSet, basename='transaction')
+router.register(r'rules', views.CategorizationRuleViewSet, basename='rule')
 
 urlpatterns = [
-    path('', include(router.urls)),
-    path('admin/', admin.site.urls),
-    path('api/', include('src.backend.urls')),
-    path('auth/', include('src.backend.auth_urls')),
-    path('', TemplateView.as_view(template_name='index.html')),
     path('', include(router.urls)),
     path('summary/', views.spending_summary, name='spending_summary'),
     path('monthly/', views.monthly_spending, name='monthly_spending'),
     path('upload-csv/', views.upload_csv, name='upload_csv'),
+    path('analytics/', views.analytics, name='analytics'),
+    path('insights/', views.insights, name='insights'),
+    path('dashboard/', views.dashboard, name='dashboard'),
     path('profile/', views.user_profile, name='user_profile'),
-    path('profile/update/', views.update_profile, name='update_profile')
+    path('profile/update/', views.update_profile, name='update_profile'),
+    path('recategorize/', views.recategorize, name='recategorize'),
+    path('recategorize/<int:job_id>/', views.recategorize_status, name='recategorize_status'),
+    path('perf/', views.performance_stats, name='performance_stats')
 ]
 
 # settings.py additions
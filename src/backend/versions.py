@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+def _version_key(namespace, user_id):
+    return f'data-version:{namespace}:{user_id}'
+
+
+def _fresh_version():
+    # A version nobody has built a cache from, even after the key was evicted
+    return time.time_ns()
+
+
+def get_data_version(user_id, namespace='transactions'):
+    """
+    Return the current version of a user's data in the given namespace.
+    In-process caches compare it against the version they were built from.
+    """
+    return cache.get_or_set(_version_key(namespace, user_id), _fresh_version, timeout=None)
+
+
+def bump_data_version(user_id, namespace='transactions'):
+    """
+    Invalidate everything cached from a user's data in the given namespace.
+    """
+    key = _version_key(namespace, user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key expired, was evicted or was never read: start a fresh version
+        version = _fresh_version()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+class VersionedCache:
+    """
+    Per-worker LRU of values built from one user's data, each tagged with the
+    user's data version in `namespace` when it was built, and optionally expiring
+    after `ttl` seconds. An entry is used only while that version is unchanged.
+    """
+
+    def __init__(self, namespace='transactions', maxsize=128, ttl=None):
+        self.namespace = namespace
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key, version=None):
+        '''
+
+        :param key: cache key, the user id unless stored otherwise
+        :param version: the owner's current data version when already known
+        :return: the cached value, or None when missing, expired or built from an older version
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        user_id, entry_version, expires, value = entry
+        if version is None:
+            version = get_data_version(user_id, namespace=self.namespace)
+        if entry_version != version or (expires is not None and expires < time.monotonic()):
+            self.discard(key)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return value
+
+    def store(self, key, value, user_id, version=None):
+        '''
+
+        :param key: cache key
+        :param value: value built from the user's data
+        :param user_id: owner of the data the value was built from
+        :param version: the version read before building the value, so a write
+            during the build leaves the entry already stale
+        '''
+        if version is None:
+            version = get_data_version(user_id, namespace=self.namespace)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (user_id, version, expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, user_id, build):
+        version = get_data_version(user_id, namespace=self.namespace)
+        value = self.lookup(user_id, version)
+        if value is None:
+            value = build(user_id)
+            self.store(user_id, value, user_id, version)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,22 +1,33 @@
-from django.db.models import Sum, Avg, Max, Min, Count
 from django.utils import timezone
 from datetime import datetime, timedelta
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Category, Expense, Transaction
+from .models import Category, Expense, Transaction, RecurringPayment, SpendingAnomaly, YearlyRollup
+from .models import CategorizationRule, RecategorizationJob
 from .serializers import CategorySerializer, ExpenseSerializer, UserSerializer, TransactionSerializer
-from django.db.models import Sum
+from .serializers import RecurringPaymentSerializer, SpendingAnomalySerializer, CategorizationRuleSerializer
+from .serializers import RecategorizationJobSerializer
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.forms import UserCreationForm
 from django.shortcuts import render, redirect
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from django.contrib.auth.models import User
-import csv
-import io
-import pandas as pd
+from .aggregations import parse_filters, apply_filters, archived_rollups, run_concurrently
+from .aggregations import expense_summary, expense_monthly_summary, spending_by_category, spending_by_month
+from .analytics import AnalyticsEngine
+from .db_router import read_from_replica
+from .detection import run_detection
+from .importer import import_statement
+from .recategorize import create_job, start_job
+from .middleware import endpoint_stats
+from .renderers import FastJSONRenderer, ColumnarRenderer, ColumnarListMixin
+from .search import search_queryset
+import json
 from datetime import datetime
 
 
@@ -29,12 +40,24 @@ class CategoryViewSet(viewsets.ModelViewSet):
         return Category.objects.filter(user=self.request.user)
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ColumnarListMixin, viewsets.ModelViewSet):
     serializer_class = ExpenseSerializer
     permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, ColumnarRenderer]
+    columnar_fields = {
+        'id': 'id',
+        'description': 'description',
+        'amount': 'amount',
+        'date': 'date',
+        'category': 'category',
+        'category_name': 'category__name',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }
 
     def get_queryset(self):
-        queryset = Expense.objects.filter(user=self.request.user)
+        # category_name is serialized for every row
+        queryset = Expense.objects.filter(user=self.request.user).select_related('category')
 
         # Filter by date range if provided
         start_date = self.request.query_params.get('start_date')
@@ -59,78 +82,35 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         if category and category != 'all':
             queryset = queryset.filter(category__name=category)
 
-        # Filter by search query if provided
+        # Filter by search query if provided (substring match on the trigram index)
         search = self.request.query_params.get('search')
         if search:
-            queryset = queryset.filter(description__icontains=search)
+            queryset = search_queryset(queryset, search)
 
         return queryset
 
     @action(detail=False, methods=['get'])
+    @read_from_replica
     def summary(self, request):
         """
         Get spending summary statistics
         """
         # Default to current month if no date range specified
         today = timezone.now().date()
-        start_date = request.query_params.get('start_date', (today.replace(day=1)).strftime('%Y-%m-%d'))
-        end_date = request.query_params.get('end_date', today.strftime('%Y-%m-%d'))
+        params = request.query_params.copy()
+        params.setdefault('start_date', today.replace(day=1).strftime('%Y-%m-%d'))
+        params.setdefault('end_date', today.strftime('%Y-%m-%d'))
 
         try:
-            start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+            filters = parse_filters(params)
         except ValueError:
             return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Base queryset with date filters
-        queryset = Expense.objects.filter(
-            user=request.user,
-            date__gte=start_date,
-            date__lte=end_date
-        )
-
-        # Filter by category if provided
-        category = request.query_params.get('category')
-        if category and category != 'all':
-            queryset = queryset.filter(category__name=category)
-
-        # Filter by search query if provided
-        search = request.query_params.get('search')
-        if search:
-            queryset = queryset.filter(description__icontains=search)
-
-        # Calculate statistics
-        stats = queryset.aggregate(
-            total=Sum('amount'),
-            avg=Avg('amount'),
-            max=Max('amount'),
-            min=Min('amount'),
-            count=Count('id')
-        )
-
-        # Get category breakdown
-        categories = []
-        for category in Category.objects.filter(user=request.user):
-            category_total = queryset.filter(category=category).aggregate(total=Sum('amount'))['total'] or 0
-            categories.append({
-                'name': category.name,
-                'amount': category_total
-            })
-
-        # Sort categories by amount (descending)
-        categories.sort(key=lambda x: x['amount'], reverse=True)
-
-        return Response({
-            'total_spending': stats['total'] or 0,
-            'avg_transaction': stats['avg'] or 0,
-            'max_expense': stats['max'] or 0,
-            'min_expense': stats['min'] or 0,
-            'transaction_count': stats['count'] or 0,
-            'categories_used': queryset.values('category').distinct().count(),
-            'spending_by_category': categories
-        })
+        queryset = apply_filters(Expense.objects.filter(user=request.user), filters)
+        return Response(expense_summary(request.user, queryset))
 
     @action(detail=False, methods=['get'])
+    @read_from_replica
     def monthly_summary(self, request):
         """
         Get monthly spending totals for the last 6 months
@@ -138,29 +118,12 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         end_date = timezone.now().date()
         start_date = end_date - timedelta(days=180)  # Approximately 6 months
 
-        # Get all expenses in date range
         expenses = Expense.objects.filter(
             user=request.user,
             date__gte=start_date,
             date__lte=end_date
         )
-
-        # Group by month and calculate totals
-        monthly_data = {}
-        for expense in expenses:
-            month_key = expense.date.strftime('%Y-%m')
-            if month_key not in monthly_data:
-                monthly_data[month_key] = {
-                    'month': expense.date.strftime('%b %Y'),
-                    'amount': 0
-                }
-            monthly_data[month_key]['amount'] += float(expense.amount)
-
-        # Convert to list and sort by month
-        result = list(monthly_data.values())
-        result.sort(key=lambda x: datetime.strptime(x['month'], '%b %Y'))
-
-        return Response(result)
+        return Response(expense_monthly_summary(expenses))
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
@@ -203,26 +166,45 @@ def register_user(request):
 @api_view(['POST'])
 def logout_user(request):
     if request.user.is_authenticated:
-        request.user.auth_token.delete()
+        # Deleting the token also drops it from every worker's token cache (see signals)
+        Token.objects.filter(user=request.user).delete()
     return Response(status=status.HTTP_200_OK)
 
 
 
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
+class TransactionViewSet(ColumnarListMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = TransactionSerializer
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, ColumnarRenderer]
+    columnar_fields = {
+        'id': 'id',
+        'date': 'date',
+        'description': 'description',
+        'amount': 'amount',
+        'category': 'category',
+        'category_name': 'category__name',
+        'category_color': 'category__color',
+    }
 
     def get_queryset(self):
         """
         This view returns a list of all transactions for the currently authenticated user.
         """
         user = self.request.user
-        return Transaction.objects.filter(user=user).order_by('-date')
+        return Transaction.objects.filter(user=user).select_related('category').order_by('-date')
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, **self._category_source(serializer))
+
+    def perform_update(self, serializer):
+        serializer.save(**self._category_source(serializer))
+
+    @staticmethod
+    def _category_source(serializer):
+        # A category picked by hand is kept by re-categorization jobs
+        return {'category_source': 'user'} if serializer.validated_data.get('category') else {}
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -240,132 +222,136 @@ class CategoryViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
+class CategorizationRuleViewSet(viewsets.ModelViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = CategorizationRuleSerializer
+
+    def get_queryset(self):
+        """
+        This view returns the categorization rules of the currently authenticated user, highest priority first.
+        """
+        return CategorizationRule.objects.filter(user=self.request.user).select_related('category')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def spending_summary(request):
     """
-    Get spending summary data grouped by category.
+    Get spending summary data grouped by category, archived years included.
     """
     user = request.user
 
     # Get query parameters
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
+    try:
+        filters = parse_filters(request.query_params)
+    except ValueError:
+        return Response({"error": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Filter transactions by date if parameters are provided
-    transactions = Transaction.objects.filter(user=user)
-    if start_date:
-        transactions = transactions.filter(date__gte=start_date)
-    if end_date:
-        transactions = transactions.filter(date__lte=end_date)
-
-    # Aggregate by category
-    category_summary = transactions.values('category__name').annotate(
-        total=Sum('amount')
-    ).order_by('-total')
-
-    # Calculate total spending
-    total_spending = transactions.aggregate(total=Sum('amount'))['total'] or 0
+    transactions = apply_filters(Transaction.objects.filter(user=user), filters)
 
-    return Response({
-        'categories': category_summary,
-        'total_spending': total_spending
-    })
+    return Response(spending_by_category(transactions, archived_rollups(user, filters)))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def monthly_spending(request):
     """
-    Get spending data grouped by month.
+    Get spending data grouped by month, archived years included.
     """
     user = request.user
 
     # Get query parameters for year
     year = request.query_params.get('year', datetime.now().year)
 
-    # Filter transactions for the specified year
-    transactions = Transaction.objects.filter(
-        user=user,
-        date__year=year
-    )
+    return Response(spending_by_month(Transaction.objects.filter(user=user), year,
+                                      YearlyRollup.objects.filter(user=user)))
 
-    # Extract month from date and group by month
-    monthly_data = {}
-    for month in range(1, 13):
-        month_transactions = transactions.filter(date__month=month)
-        total = month_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        month_name = datetime(2000, month, 1).strftime('%B')
-        monthly_data[month_name] = total
 
-    return Response(monthly_data)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@read_from_replica
+def dashboard(request):
+    """
+    Get every dashboard section in one round trip: expense summary, monthly
+    expense totals, spending by category, spending by month and categories.
+    Accepts the shared filters start_date, end_date, category, search and year.
+    The independent aggregations run concurrently on the filtered base querysets.
+    """
+    try:
+        filters = parse_filters(request.query_params)
+    except ValueError:
+        return Response({"error": "Invalid date format or year"}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = request.user
+    today = timezone.now().date()
+    expenses = apply_filters(Expense.objects.filter(user=user), filters, dates=False)
+    transactions = apply_filters(Transaction.objects.filter(user=user), filters, dates=False)
+
+    summary_filters = dict(filters)
+    summary_filters['start_date'] = filters['start_date'] or today.replace(day=1)
+    summary_filters['end_date'] = filters['end_date'] or today
+
+    sections = run_concurrently({
+        'summary': lambda: expense_summary(user, apply_filters(expenses, summary_filters)),
+        'monthly_summary': lambda: expense_monthly_summary(
+            expenses.filter(date__gte=today - timedelta(days=180), date__lte=today)),
+        'spending_summary': lambda: spending_by_category(apply_filters(transactions, filters),
+                                                         archived_rollups(user, filters)),
+        'monthly_spending': lambda: spending_by_month(transactions, filters['year'],
+                                                      archived_rollups(user, filters, dates=False)),
+        'categories': lambda: CategorySerializer(Category.objects.filter(user=user), many=True).data,
+    })
+    return Response(sections)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def upload_csv(request):
     """
-    Upload transactions from a CSV file.
-    Expected CSV format: date,description,amount,category
+    Upload transactions from a bank statement.
+    Supported formats: CSV, XLS, XLSX, OFX and QIF, detected from the file content.
+    Optional fields: reader (force a format), column_map (JSON object mapping
+    date/description/amount/debit/credit/category to column headers), date_format.
     """
     if 'file' not in request.FILES:
         return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
 
-    csv_file = request.FILES['file']
-    if not csv_file.name.endswith('.csv'):
-        return Response({'error': 'File must be a CSV'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Read the CSV file
+    statement_file = request.FILES['file']
+    reader_options = {'reader': request.data.get('reader') or None}
     try:
-        data = csv_file.read().decode('utf-8')
-        df = pd.read_csv(io.StringIO(data))
-
-        # Validate required columns
-        required_columns = ['date', 'description', 'amount', 'category']
-        for col in required_columns:
-            if col not in df.columns:
-                return Response(
-                    {'error': f'Missing required column: {col}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # Process each row
-        transactions_created = 0
-        for _, row in df.iterrows():
-            # Parse date
-            try:
-                date = datetime.strptime(row['date'], '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    date = datetime.strptime(row['date'], '%m/%d/%Y').date()
-                except ValueError:
-                    continue  # Skip rows with invalid dates
-
-            # Get or create category
-            category_name = row['category']
-            category, _ = Category.objects.get_or_create(
-                name=category_name,
-                user=request.user
-            )
-
-            # Create transaction
-            Transaction.objects.create(
-                user=request.user,
-                date=date,
-                description=row['description'],
-                amount=float(row['amount']),
-                category=category
-            )
-            transactions_created += 1
-
-        return Response({
-            'success': True,
-            'transactions_created': transactions_created
-        })
+        if request.data.get('column_map'):
+            reader_options['column_map'] = json.loads(request.data['column_map'])
+        if request.data.get('date_format'):
+            reader_options['date_formats'] = [request.data['date_format']]
+    except ValueError:
+        return Response({'error': 'column_map must be a JSON object'}, status=status.HTTP_400_BAD_REQUEST)
 
+    try:
+        transactions_created, duplicates_skipped, archived_skipped = import_statement(
+            request.user, statement_file.file, filename=statement_file.name, **reader_options
+        )
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    # Incremental: only the rows added by this upload are scanned
+    detection = run_detection(request.user)
+
+    return Response({
+        'success': True,
+        'transactions_created': transactions_created,
+        'duplicates_skipped': duplicates_skipped,
+        # Dated in already archived history, where they can't be checked for duplicates
+        'archived_skipped': archived_skipped,
+        'recurring_payments_found': detection['recurring'],
+        'anomalies_found': detection['anomalies']
+    })
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -392,186 +378,98 @@ def update_profile(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class TransactionViewSet(viewsets.ModelViewSet):
-    permission_classes = [permissions.IsAuthenticated]
-    serializer_class = TransactionSerializer
-
-    def get_queryset(self):
-        """
-        This view returns a list of all transactions for the currently authenticated user.
-        """
-        user = self.request.user
-        return Transaction.objects.filter(user=user).order_by('-date')
-
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-
-
-class CategoryViewSet(viewsets.ModelViewSet):
-    permission_classes = [permissions.IsAuthenticated]
-    serializer_class = CategorySerializer
-
-    def get_queryset(self):
-        """
-        This view returns a list of all categories for the currently authenticated user.
-        """
-        user = self.request.user
-        return Category.objects.filter(user=user)
-
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def spending_summary(request):
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer, ColumnarRenderer])
+@read_from_replica
+def analytics(request):
     """
-    Get spending summary data grouped by category.
+    Get vectorized analytics computed from the user's cached transaction frame.
+    Optional query params: sections (comma-separated), start_date, end_date, category, limit.
+    With format=columnar, row-shaped sections come back as one array per field.
     """
-    user = request.user
+    sections = request.query_params.get('sections')
+    sections = sections.split(',') if sections else list(AnalyticsEngine.SECTIONS)
+    unknown = [section for section in sections if section not in AnalyticsEngine.SECTIONS]
+    if unknown:
+        return Response({'error': f"Unknown sections: {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Get query parameters
-    start_date = request.query_params.get('start_date')
-    end_date = request.query_params.get('end_date')
-
-    # Filter transactions by date if parameters are provided
-    transactions = Transaction.objects.filter(user=user)
-    if start_date:
-        transactions = transactions.filter(date__gte=start_date)
-    if end_date:
-        transactions = transactions.filter(date__lte=end_date)
-
-    # Aggregate by category
-    category_summary = transactions.values('category__name').annotate(
-        total=Sum('amount')
-    ).order_by('-total')
-
-    # Calculate total spending
-    total_spending = transactions.aggregate(total=Sum('amount'))['total'] or 0
-
-    return Response({
-        'categories': category_summary,
-        'total_spending': total_spending
-    })
+    try:
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        limit = int(request.query_params.get('limit', 10))
+    except ValueError:
+        return Response({"error": "Invalid date format or limit"}, status=status.HTTP_400_BAD_REQUEST)
+
+    engine = AnalyticsEngine.for_user(
+        request.user.pk,
+        start_date=start_date,
+        end_date=end_date,
+        category=request.query_params.get('category')
+    )
+    return Response(engine.run(sections, limit=limit))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def monthly_spending(request):
+def insights(request):
     """
-    Get spending data grouped by month.
+    Get detected recurring payments (subscriptions, EMIs) and monthly spending spikes.
     """
-    user = request.user
-
-    # Get query parameters for year
-    year = request.query_params.get('year', datetime.now().year)
-
-    # Filter transactions for the specified year
-    transactions = Transaction.objects.filter(
-        user=user,
-        date__year=year
-    )
-
-    # Extract month from date and group by month
-    monthly_data = {}
-    for month in range(1, 13):
-        month_transactions = transactions.filter(date__month=month)
-        total = month_transactions.aggregate(total=Sum('amount'))['total'] or 0
-        month_name = datetime(2000, month, 1).strftime('%B')
-        monthly_data[month_name] = total
-
-    return Response(monthly_data)
+    return Response({
+        'recurring_payments': RecurringPaymentSerializer(
+            RecurringPayment.objects.filter(user=request.user), many=True).data,
+        'anomalies': SpendingAnomalySerializer(
+            SpendingAnomaly.objects.filter(user=request.user), many=True).data
+    })
 
 
-@api_view(['POST'])
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
-def upload_csv(request):
+def recategorize(request):
     """
-    Upload transactions from a CSV file.
-    Expected CSV format: date,description,amount,category
+    POST: re-categorize the user's transactions with their current rules and the
+    category dictionary in the background (optional only_uncategorized, and
+    overwrite_user_categories to also replace categories the user supplied). An
+    unfinished job is returned instead of starting a second one.
+    GET: the user's recent jobs, newest first.
     """
-    if 'file' not in request.FILES:
-        return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
-
-    csv_file = request.FILES['file']
-    if not csv_file.name.endswith('.csv'):
-        return Response({'error': 'File must be a CSV'}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Read the CSV file
-    try:
-        data = csv_file.read().decode('utf-8')
-        df = pd.read_csv(io.StringIO(data))
-
-        # Validate required columns
-        required_columns = ['date', 'description', 'amount', 'category']
-        for col in required_columns:
-            if col not in df.columns:
-                return Response(
-                    {'error': f'Missing required column: {col}'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-
-        # Process each row
-        transactions_created = 0
-        for _, row in df.iterrows():
-            # Parse date
-            try:
-                date = datetime.strptime(row['date'], '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    date = datetime.strptime(row['date'], '%m/%d/%Y').date()
-                except ValueError:
-                    continue  # Skip rows with invalid dates
-
-            # Get or create category
-            category_name = row['category']
-            category, _ = Category.objects.get_or_create(
-                name=category_name,
-                user=request.user
-            )
-
-            # Create transaction
-            Transaction.objects.create(
-                user=request.user,
-                date=date,
-                description=row['description'],
-                amount=float(row['amount']),
-                category=category
-            )
-            transactions_created += 1
-
-        return Response({
-            'success': True,
-            'transactions_created': transactions_created
-        })
+    if request.method == 'POST':
+        only_uncategorized = str(request.data.get('only_uncategorized', '')).lower() in ('1', 'true')
+        overwrite = str(request.data.get('overwrite_user_categories', '')).lower() in ('1', 'true')
+        job = create_job(request.user, only_uncategorized=only_uncategorized, overwrite_user_categories=overwrite)
+        start_job(job)
+        return Response(RecategorizationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-    except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    jobs = RecategorizationJob.objects.filter(user=request.user)[:10]
+    return Response(RecategorizationJobSerializer(jobs, many=True).data)
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def user_profile(request):
+def recategorize_status(request, job_id):
     """
-    Get the current user's profile information.
+    Get the progress of one re-categorization job.
     """
-    serializer = UserSerializer(request.user)
-    return Response(serializer.data)
+    job = RecategorizationJob.objects.filter(user=request.user, pk=job_id).first()
+    if job is None:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(RecategorizationJobSerializer(job).data)
 
 
-@api_view(['PUT'])
-@permission_classes([IsAuthenticated])
-def update_profile(request):
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def performance_stats(request):
     """
-    Update the current user's profile information.
+    Get rolling per-endpoint request timings collected by PerformanceMiddleware.
     """
-    user = request.user
-    serializer = UserSerializer(user, data=request.data, partial=True)
-
-    if serializer.is_valid():
-        serializer.save()
-        return Response(serializer.data)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'enabled': settings.PERF_INSTRUMENTATION,
+        'query_threshold': settings.PERF_QUERY_THRESHOLD,
+        'endpoints': endpoint_stats.snapshot()
+    })
 
 
 def register(request):
@@ -2,16 +2,21 @@
 @author: Akul
 """
 
+import os
+
 from src.utils.sheet_utils import get_category
 from src.utils.excel_utils import convert_xls_to_dataframe
 from src.utils.config_utils import read_category_config
+from src.utils.report_utils import write_spend_report
 category_dict = read_category_config()
 
 #this is the delimiter which sandwiches a generic balancesheet
 sheet_delimiter = "----------------------"
-raw_root_path = "..\\input_files"
+raw_root_path = os.path.join("..", "input_files")
 
-spend_df = convert_xls_to_dataframe(raw_root_path, sheet_delimiter=sheet_delimiter)
+# the statement's own columns are kept for the Power BI template's Sheet1 query
+spend_df = convert_xls_to_dataframe(raw_root_path, sheet_delimiter=sheet_delimiter, keep_columns=True)
 spend_df.reset_index(inplace=True,drop = True)
-spend_df['category']=spend_df['PARTICULARS'].apply(lambda x : get_category(x,category_map=category_dict))
-spend_df.to_excel("..\\reports\\spend.xlsx")
\ No newline at end of file
+spend_df['category']=spend_df['description'].apply(lambda x : get_category(x,category_map=category_dict))
+# written in the Power BI template's Sheet1 layout, with the category/month summaries precomputed
+write_spend_report(spend_df, os.path.join("..", "reports", "spend.xlsx"))
@@ -1,23 +1,86 @@
 import os
 import sys
 import argparse
-import django
-from django.core.management import execute_from_command_line
 
 
 def setup_django_environment():
     """Set up Django environment"""
-    print(sys.path)
+    # Imported here so --help and --import-report don't pay for loading Django
+    import django
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'src.backend.spend_analysis.settings')
     django.setup()
 
 
 def run_server(host='127.0.0.1', port=8000):
     """Run the Django development server"""
+    from django.core.management import execute_from_command_line
     print(f"Starting Spend Analysis server at http://{host}:{port}/")
     execute_from_command_line(['manage.py', 'runserver', f'{host}:{port}'])
 
 
+def server_defaults():
+    """Worker and thread counts derived from the CPU count (WEB_CONCURRENCY overrides workers)"""
+    cpus = os.cpu_count() or 1
+    workers = int(os.environ.get('WEB_CONCURRENCY', 0)) or cpus * 2 + 1
+    threads = int(os.environ.get('WEB_THREADS', 0)) or min(4, cpus * 2)
+    return workers, threads
+
+
+def serve(host='127.0.0.1', port=8000, workers=None, threads=None, use_asgi=False, reload=False):
+    """Run the multi-worker production server (gunicorn)"""
+    try:
+        from gunicorn.app.base import BaseApplication
+        from gunicorn.util import import_app
+    except ImportError:
+        print("gunicorn is not installed (it does not run on Windows); use --run for the development server")
+        sys.exit(1)
+
+    from src.backend.checks import cache_backend, cache_is_shared
+
+    default_workers, default_threads = server_defaults()
+    workers = workers or default_workers
+    if workers > 1 and not cache_is_shared():
+        # Per-worker caches are invalidated through data versions in the Django cache
+        print(f"CACHE_BACKEND is {cache_backend()}, which each worker keeps to itself, so a write "
+              "would not invalidate the other workers' cached data. Set CACHE_BACKEND and CACHE_LOCATION "
+              "to a shared cache (e.g. django.core.cache.backends.redis.RedisCache), or run --workers 1")
+        sys.exit(1)
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'threads': threads or default_threads,
+        # Import the app once in the master so workers share its memory copy-on-write.
+        # The master then holds the old code: SIGHUP only restarts workers from it, so
+        # deploying new code needs a new master (USR2), and --reload turns preloading off
+        'preload_app': not reload,
+        'reload': reload,
+        'graceful_timeout': 30,
+        'accesslog': '-',
+        'errorlog': '-',
+    }
+    app_uri = 'src.backend.spend_analysis.wsgi:application'
+    if use_asgi:
+        app_uri = 'src.backend.spend_analysis.asgi:application'
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+    elif options['threads'] > 1:
+        options['worker_class'] = 'gthread'
+
+    class SpendAnalysisServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return import_app(app_uri)
+
+    print(f"Serving Spend Analysis at http://{host}:{port}/ with {options['workers']} workers "
+          f"x {options['threads']} threads, master pid {os.getpid()}")
+    if options['preload_app']:
+        print("To deploy new code, send USR2 to the master pid to start a new master, then TERM "
+              "to the old one once the new workers are up (SIGHUP keeps the preloaded code)")
+    SpendAnalysisServer().run()
+
+
 def create_superuser():
     """Create a superuser for the admin interface"""
     from django.contrib.auth.models import User
@@ -67,6 +130,7 @@ def setup_initial_data():
 
 def init_database():
     """Initialize the database with migrations"""
+    from django.core.management import execute_from_command_line
     print("Setting up database...")
     execute_from_command_line(['spend_analysis_main.py', 'makemigrations', 'backend'])
     execute_from_command_line(['spend_analysis_main.py', 'migrate'])
@@ -76,15 +140,35 @@ def init_database():
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='Spend Analysis Application')
-    parser.add_argument('--run', action='store_true', help='Run the server')
+    parser.add_argument('--run', action='store_true', help='Run the development server')
+    parser.add_argument('--serve', action='store_true', help='Run the multi-worker production server')
+    parser.add_argument('--workers', type=int, default=None, help='Server worker processes (default 2 x CPUs + 1)')
+    parser.add_argument('--threads', type=int, default=None, help='Threads per worker (default 2 x CPUs, max 4)')
+    parser.add_argument('--asgi', action='store_true', help='Serve the ASGI app with uvicorn workers')
+    parser.add_argument('--reload', action='store_true', help='Restart workers when code changes')
     parser.add_argument('--host', default='127.0.0.1', help='Host to run the server on')
     parser.add_argument('--port', type=int, default=8000, help='Port to run the server on')
     parser.add_argument('--init', action='store_true', help='Initialize the database')
     parser.add_argument('--superuser', action='store_true', help='Create a superuser')
     parser.add_argument('--setup-data', action='store_true', help='Set up initial data')
+    parser.add_argument('--import-report', action='store_true',
+                        help='Report import time of the CLI and WSGI app startup')
+    parser.add_argument('--import-budget-ms', type=int, default=None,
+                        help='Exit with an error when a startup target imports for longer than this')
 
     args = parser.parse_args()
 
+    if args.import_report:
+        from src.utils.importtime_utils import import_report
+        if not import_report(budget_ms=args.import_budget_ms):
+            sys.exit(1)
+        return
+
+    # If no arguments are provided, show help
+    if len(sys.argv) == 1:
+        parser.print_help()
+        return
+
     setup_django_environment()
 
     if args.init:
@@ -99,9 +183,9 @@ def main():
     if args.run:
         run_server(host=args.host, port=args.port)
 
-    # If no arguments are provided, show help
-    if len(sys.argv) == 1:
-        parser.print_help()
+    if args.serve:
+        serve(host=args.host, port=args.port, workers=args.workers, threads=args.threads,
+              use_asgi=args.asgi, reload=args.reload)
 
 
 if __name__ == '__main__':
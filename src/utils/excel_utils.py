@@ -1,6 +1,8 @@
 import pandas as pd
 import os
 
+from src.utils.statement_readers import iter_statement, detect_reader, normalize_description
+
 def slice_xls(file_path, sheet_delimiter):
     xlsObject = pd.ExcelFile(r"{file_path}".format(file_path=file_path))
     sheet0_df = xlsObject.parse(0)
@@ -13,12 +15,47 @@ def slice_xls(file_path, sheet_delimiter):
     return sliced_df
 
 
-def convert_xls_to_dataframe(raw_root_path, sheet_delimiter):
+def drop_duplicate_transactions(df):
+    '''
+
+    :param df: normalized rows of one or more statements, with a 'statement' column naming the file
+    :return: df without the rows repeated by overlapping statements; identical rows within
+        one statement (two equal purchases on one day) are kept
+    '''
+    key = [df['date'], df['amount'], df['description'].map(normalize_description)]
+    ordinal = df.groupby([df['statement']] + key).cumcount()
+    duplicated = pd.concat(key + [ordinal], axis=1).duplicated()
+    return df[~duplicated.to_numpy()]
+
+
+def convert_xls_to_dataframe(raw_root_path, sheet_delimiter, deduplicate=True, keep_columns=False, **reader_options):
+    '''
+
+    :param raw_root_path: folder holding the statement files (xls, xlsx, csv, ofx, qif)
+    :param sheet_delimiter: delimiter which sandwiches the table in the legacy xls layout
+    :param deduplicate: drop rows repeated by overlapping statements
+    :param keep_columns: also keep the statement's own columns (e.g. SRL NO, Tran Date, CHQNO,
+        PARTICULARS, DR, CR, BAL of the legacy layout) next to the normalized ones
+    :param reader_options: passed to the statement readers, e.g. column_map or date_formats
+    :return: one dataframe of normalized rows (date, description, amount, category)
+    '''
     df_list = []
-    for xls_file in os.listdir(raw_root_path):
-        file_path = raw_root_path + "\\" + xls_file
-        raw_df = slice_xls(file_path, sheet_delimiter)
-        df_list.append(raw_df)
+    for statement_file in sorted(os.listdir(raw_root_path)):
+        file_path = os.path.join(raw_root_path, statement_file)
+        with open(file_path, 'rb') as statement:
+            if detect_reader(statement_file, statement.read(2048)) is None:
+                continue
+        for batch in iter_statement(file_path, sheet_delimiter=sheet_delimiter, keep_columns=keep_columns,
+                                    **reader_options):
+            batch_df = pd.DataFrame.from_records(batch)
+            if 'columns' in batch_df:
+                original = pd.DataFrame.from_records(batch_df.pop('columns').tolist())
+                original = original[[column for column in original.columns if column not in batch_df.columns]]
+                batch_df = pd.concat([batch_df, original], axis=1)
+            batch_df['statement'] = statement_file
+            df_list.append(batch_df)
 
-    xls_df = pd.concat(df_list)
-    return xls_df
\ No newline at end of file
+    xls_df = pd.concat(df_list, ignore_index=True)
+    if deduplicate:
+        xls_df = drop_duplicate_transactions(xls_df)
+    return xls_df.drop(columns='statement')
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+WSGI_STARTUP = (
+    "import src.backend.spend_analysis.wsgi;"
+    "from django.urls import get_resolver;"
+    "get_resolver().url_patterns"
+)
+
+# Startup targets: name -> python arguments that start it
+STARTUP_TARGETS = {
+    'cli': ['-m', 'src.spend_analysis_main', '--help'],
+    'wsgi': ['-c', WSGI_STARTUP],
+}
+
+
+def parse_importtime(stderr):
+    '''
+
+    :param stderr: stderr of a python process started with -X importtime
+    :return: list of (module, self_us, cumulative_us, depth) in import order
+    '''
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure_startup(target):
+    '''
+
+    :param target: key of STARTUP_TARGETS
+    :return: dict with wall time, total import time and the parsed import entries
+    '''
+    command = [sys.executable, "-X", "importtime"] + STARTUP_TARGETS[target]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    entries = parse_importtime(completed.stderr)
+    return {
+        'target': target,
+        'returncode': completed.returncode,
+        'wall_ms': wall_ms,
+        'import_ms': sum(entry[2] for entry in entries if entry[3] == 0) / 1000,
+        'entries': entries,
+    }
+
+
+def format_report(result, top=15):
+    lines = [
+        f"{result['target']}: {result['wall_ms']:.0f} ms wall, "
+        f"{result['import_ms']:.0f} ms importing (exit code {result['returncode']})"
+    ]
+    top_level = sorted((entry for entry in result['entries'] if entry[3] == 0),
+                       key=lambda entry: entry[2], reverse=True)
+    for module, _, cumulative_us, _ in top_level[:top]:
+        lines.append(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    return "\n".join(lines)
+
+
+def import_report(budget_ms=None, top=15):
+    '''
+
+    :param budget_ms: fail when a target's import time exceeds this many milliseconds
+    :param top: number of slowest top-level imports listed per target
+    :return: True when every target started and stayed within the budget
+    '''
+    within_budget = True
+    for target in STARTUP_TARGETS:
+        result = measure_startup(target)
+        print(format_report(result, top=top))
+        if result['returncode'] != 0:
+            print("  startup failed")
+            within_budget = False
+        elif budget_ms is not None and result['import_ms'] > budget_ms:
+            print(f"  over budget: {result['import_ms']:.0f} ms > {budget_ms} ms")
+            within_budget = False
+    return within_budget
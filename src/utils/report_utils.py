@@ -0,0 +1,114 @@
+import pandas as pd
+
+# Columns of Sheet1 typed by the Power BI template's query: the legacy statement layout plus category
+TEMPLATE_COLUMNS = ['SRL NO', 'Tran Date', 'CHQNO', 'PARTICULARS', 'DR', 'CR', 'BAL', 'category']
+MONEY_FORMAT = '#,##0.00'
+
+
+def category_summary(df):
+    '''
+
+    :param df: spend rows with amount and category columns
+    :return: total, count and average amount per category, largest total first
+    '''
+    summary = df.groupby('category')['amount'].agg(total='sum', count='count', average='mean')
+    return summary.sort_values('total', ascending=False).reset_index()
+
+
+def month_summary(df):
+    '''
+
+    :param df: spend rows with date and amount columns
+    :return: total and count of amounts per YYYY-MM month, oldest first
+    '''
+    months = pd.to_datetime(df['date']).dt.strftime('%Y-%m').rename('month')
+    return df.groupby(months)['amount'].agg(total='sum', count='count').reset_index()
+
+
+def category_month_summary(df):
+    '''
+
+    :param df: spend rows with date, amount and category columns
+    :return: category x month pivot of total amounts, with a total column
+    '''
+    months = pd.to_datetime(df['date']).dt.strftime('%Y-%m').rename('month')
+    pivot = df.pivot_table(index='category', columns=months, values='amount', aggfunc='sum', fill_value=0)
+    pivot['total'] = pivot.sum(axis=1)
+    return pivot.sort_values('total', ascending=False).reset_index()
+
+
+def template_frame(df):
+    '''
+
+    :param df: spend rows with date, description, amount and category columns, plus the statement's
+        own SRL NO, CHQNO and BAL columns when the readers kept them
+    :return: the rows in the TEMPLATE_COLUMNS layout; DR and CR are split from the signed amount,
+        SRL NO falls back to the row number and CHQNO/BAL stay empty for statements without them
+    '''
+    amount = df['amount'].astype('float64').reset_index(drop=True)
+    serial = pd.Series(range(1, len(df) + 1))
+
+    def original(column):
+        return df[column].reset_index(drop=True) if column in df else pd.Series([None] * len(df), dtype=object)
+
+    return pd.DataFrame({
+        'SRL NO': pd.to_numeric(original('SRL NO'), errors='coerce').fillna(serial).astype('int64'),
+        'Tran Date': pd.to_datetime(df['date']).reset_index(drop=True),
+        'CHQNO': original('CHQNO'),
+        'PARTICULARS': df['description'].reset_index(drop=True),
+        'DR': amount.where(amount > 0),
+        'CR': (-amount).where(amount < 0),
+        'BAL': pd.to_numeric(original('BAL'), errors='coerce'),
+        'category': df['category'].fillna('Unknown').reset_index(drop=True),
+    }, columns=TEMPLATE_COLUMNS)
+
+
+def _write_frame(workbook, name, frame, money_columns=(), chunk_size=10000):
+    # constant_memory flushes every row once the next one starts, so rows go strictly top to bottom
+    worksheet = workbook.add_worksheet(name)
+    bold = workbook.add_format({'bold': True})
+    money = workbook.add_format({'num_format': MONEY_FORMAT})
+    worksheet.write_row(0, 0, [str(column) for column in frame.columns], bold)
+    for index, column in enumerate(frame.columns):
+        if column in money_columns:
+            worksheet.set_column(index, index, 14, money)
+
+    row_number = 1
+    for start in range(0, len(frame), chunk_size):
+        for values in frame.iloc[start:start + chunk_size].itertuples(index=False, name=None):
+            worksheet.write_row(row_number, 0, [None if pd.isna(value) else value for value in values])
+            row_number += 1
+    return worksheet
+
+
+def write_spend_report(df, report_path, transactions_sheet='Sheet1'):
+    '''
+
+    :param df: spend rows with date, description, amount and category columns (see template_frame)
+    :param report_path: xlsx file to write
+    :param transactions_sheet: name of the row-level sheet read by the Power BI template
+    :return: report_path, holding the rows in the template's TEMPLATE_COLUMNS layout followed by
+        precomputed Category, Month and Category x Month summary sheets. Only the writing is constant
+        memory (xlsxwriter's constant_memory mode flushes each row); df and the summaries are built
+        in memory, since overlapping statements are deduplicated and summarized across all rows.
+    '''
+    import xlsxwriter
+
+    sheet = template_frame(df)
+    rows = pd.DataFrame({'date': sheet['Tran Date'], 'amount': df['amount'].astype('float64').to_numpy(),
+                         'category': sheet['category']})
+    workbook = xlsxwriter.Workbook(report_path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'nan_inf_to_errors': True,
+    })
+    try:
+        _write_frame(workbook, transactions_sheet, sheet, money_columns=('DR', 'CR', 'BAL'))
+        _write_frame(workbook, 'Category', category_summary(rows), money_columns=('total', 'average'))
+        _write_frame(workbook, 'Month', month_summary(rows), money_columns=('total',))
+        pivot = category_month_summary(rows)
+        _write_frame(workbook, 'Category x Month', pivot,
+                     money_columns=[column for column in pivot.columns if column != 'category'])
+    finally:
+        workbook.close()
+    return report_path
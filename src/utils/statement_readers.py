@@ -0,0 +1,392 @@
+import csv
+import io
+import os
+import re
+from datetime import datetime, date
+
+# Header aliases used to find the normalized columns when no column map is given
+COLUMN_ALIASES = {
+    'date': ['date', 'tran date', 'txn date', 'transaction date', 'value date', 'posting date'],
+    'description': ['description', 'particulars', 'narration', 'details', 'payee', 'memo', 'remarks'],
+    'amount': ['amount', 'transaction amount'],
+    'debit': ['debit', 'withdrawal', 'withdrawals', 'withdrawal amt', 'dr'],
+    'credit': ['credit', 'deposit', 'deposits', 'deposit amt', 'cr'],
+    'category': ['category'],
+}
+DEFAULT_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y', '%d-%b-%Y', '%d %b %Y', '%Y%m%d']
+DEFAULT_BATCH_SIZE = 1000
+# First cell of the rows sandwiching the transaction table in the legacy spreadsheet layout
+LEGACY_TABLE_MARKER = '\t'
+
+READERS = {}
+
+
+class StatementFormatError(ValueError):
+    pass
+
+
+def register_reader(reader_class):
+    '''
+
+    :param reader_class: StatementReader subclass to make available under reader_class.name
+    :return: the class, so this works as a decorator
+    '''
+    READERS[reader_class.name] = reader_class
+    return reader_class
+
+
+def parse_date(value, date_formats):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for date_format in date_formats:
+        try:
+            return datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_amount(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r'[^0-9.\-]', '', str(value))
+    if text in ('', '-', '.'):
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def normalize_description(description):
+    '''
+
+    :param description: raw statement description
+    :return: lower-cased description with whitespace collapsed, used for duplicate detection
+    '''
+    return ' '.join(str(description or '').lower().split())
+
+
+def resolve_columns(header, column_map=None):
+    '''
+
+    :param header: list of header cells of a statement table
+    :param column_map: optional mapping of normalized field -> header name
+    :return: mapping of normalized field -> column index, or None if the header
+        doesn't hold a date, a description and an amount (or debit/credit) column
+    '''
+    cells = [str(cell).strip().lower() if cell is not None else '' for cell in header]
+    columns = {}
+    if column_map:
+        for field, name in column_map.items():
+            if name.strip().lower() in cells:
+                columns[field] = cells.index(name.strip().lower())
+    else:
+        for field, aliases in COLUMN_ALIASES.items():
+            for index, cell in enumerate(cells):
+                if cell in aliases or cell.rstrip('.').split('(')[0].strip() in aliases:
+                    columns[field] = index
+                    break
+
+    has_amount = 'amount' in columns or 'debit' in columns or 'credit' in columns
+    if 'date' not in columns or 'description' not in columns or not has_amount:
+        return None
+    return columns
+
+
+class StatementReader:
+    """
+    Base class of the statement readers. Subclasses stream a binary file object
+    and yield batches of normalized rows:
+    {'date': date, 'description': str, 'amount': float, 'category': str or None}
+    with spending as positive amounts. With the keep_columns option, rows read
+    from a table also carry the original cells under 'columns', keyed by header.
+    The sheet_delimiter option (the legacy layout's marker column) ends the table
+    at the next row marked with a tab, whatever the file format.
+    """
+    name = None
+    extensions = ()
+
+    def __init__(self, column_map=None, date_formats=None, **options):
+        self.column_map = column_map
+        self.date_formats = date_formats or DEFAULT_DATE_FORMATS
+        self.options = options
+
+    @classmethod
+    def sniff(cls, head):
+        '''
+
+        :param head: first bytes of the file
+        :return: True if the content is recognisably in this reader's format
+        '''
+        return False
+
+    def iter_rows(self, fileobj):
+        raise NotImplementedError
+
+    def iter_batches(self, fileobj, batch_size=DEFAULT_BATCH_SIZE):
+        batch = []
+        for row in self.iter_rows(fileobj):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def normalize(self, date_value, description, amount=None, debit=None, credit=None, category=None):
+        row_date = parse_date(date_value, self.date_formats) if date_value not in (None, '') else None
+        if row_date is None:
+            return None
+        if amount is None:
+            debit, credit = parse_amount(debit), parse_amount(credit)
+            if debit is None and credit is None:
+                return None
+            amount = (debit or 0) - (credit or 0)
+        else:
+            amount = parse_amount(amount)
+            if amount is None:
+                return None
+        return {
+            'date': row_date,
+            'description': str(description or '').strip(),
+            'amount': round(amount, 2),
+            'category': str(category).strip() if category not in (None, '') else None,
+        }
+
+    @property
+    def stop_marker(self):
+        '''
+
+        :return: value in the first cell that ends the table after the header, or None
+        '''
+        return LEGACY_TABLE_MARKER if self.options.get('sheet_delimiter') else None
+
+    def iter_table(self, rows):
+        '''
+
+        :param rows: iterable of row value lists, preamble rows included
+        :return: normalized rows of the first table whose header can be resolved
+        '''
+        stop_marker = self.stop_marker
+        columns = None
+        keep_columns = self.options.get('keep_columns', False)
+        for values in rows:
+            if columns is None:
+                columns = resolve_columns(values, self.column_map)
+                header = [str(cell).strip() if cell is not None else '' for cell in values]
+                continue
+            if stop_marker is not None and values and values[0] == stop_marker:
+                break
+
+            def cell(field):
+                index = columns.get(field)
+                return values[index] if index is not None and index < len(values) else None
+
+            row = self.normalize(cell('date'), cell('description'), amount=cell('amount'),
+                                 debit=cell('debit'), credit=cell('credit'), category=cell('category'))
+            if row is not None:
+                if keep_columns:
+                    row['columns'] = {name: value for name, value in zip(header, values) if name}
+                yield row
+
+        if columns is None:
+            raise StatementFormatError("Could not find date, description and amount columns")
+
+
+@register_reader
+class CsvReader(StatementReader):
+    name = 'csv'
+    extensions = ('.csv', '.txt')
+
+    def iter_rows(self, fileobj):
+        text = io.TextIOWrapper(fileobj, encoding=self.options.get('encoding', 'utf-8-sig'), newline='')
+        delimiter = self.options.get('delimiter')
+        if delimiter is None:
+            sample = text.read(4096)
+            text.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+            except csv.Error:
+                delimiter = ','
+        try:
+            yield from self.iter_table(csv.reader(text, delimiter=delimiter))
+        finally:
+            text.detach()
+
+
+@register_reader
+class XlsxReader(StatementReader):
+    name = 'xlsx'
+    extensions = ('.xlsx', '.xlsm')
+
+    @classmethod
+    def sniff(cls, head):
+        return head.startswith(b'PK\x03\x04')
+
+    def iter_rows(self, fileobj):
+        from openpyxl import load_workbook
+
+        # Read-only mode streams rows from the zipped XML instead of building the workbook
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[self.options.get('sheet', 0)]
+            yield from self.iter_table(sheet.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+
+@register_reader
+class XlsReader(StatementReader):
+    """
+    Legacy .xls statements, including the delimiter-sandwiched layout where the
+    transaction table sits between two rows marked with a tab in the first column.
+    The binary .xls format can't be streamed, so the sheet is parsed once and its
+    rows are then yielded in batches like every other reader.
+    """
+    name = 'xls'
+    extensions = ('.xls',)
+
+    @classmethod
+    def sniff(cls, head):
+        return head.startswith(b'\xd0\xcf\x11\xe0')
+
+    def iter_rows(self, fileobj):
+        import pandas as pd
+
+        sheet = pd.read_excel(fileobj, sheet_name=self.options.get('sheet', 0), header=None, dtype=object)
+        rows = (
+            [None if pd.isna(value) else value for value in values]
+            for values in sheet.itertuples(index=False, name=None)
+        )
+        yield from self.iter_table(rows)
+
+
+@register_reader
+class OfxReader(StatementReader):
+    name = 'ofx'
+    extensions = ('.ofx', '.qfx')
+
+    @classmethod
+    def sniff(cls, head):
+        return b'OFXHEADER' in head or b'<OFX>' in head.upper()
+
+    def iter_rows(self, fileobj):
+        text = io.TextIOWrapper(fileobj, encoding=self.options.get('encoding', 'latin-1'))
+        try:
+            block = None
+            for line in text:
+                upper = line.upper()
+                if '<STMTTRN>' in upper:
+                    block = []
+                if block is not None:
+                    block.append(line)
+                if '</STMTTRN>' in upper and block is not None:
+                    row = self._parse_block(''.join(block))
+                    block = None
+                    if row is not None:
+                        yield row
+        finally:
+            text.detach()
+
+    def _parse_block(self, block):
+        fields = {tag.upper(): value.strip() for tag, value in re.findall(r'<(\w+)>([^<\r\n]*)', block)}
+        amount = parse_amount(fields.get('TRNAMT'))
+        if amount is None:
+            return None
+        description = fields.get('NAME') or fields.get('MEMO') or fields.get('PAYEE', '')
+        # OFX amounts are signed from the account's view: debits are negative
+        return self.normalize(fields.get('DTPOSTED', '')[:8], description, amount=-amount)
+
+
+@register_reader
+class QifReader(StatementReader):
+    name = 'qif'
+    extensions = ('.qif',)
+    QIF_DATE_FORMATS = ['%m/%d/%Y', '%m/%d/%y', '%d/%m/%Y', '%Y-%m-%d']
+
+    def __init__(self, column_map=None, date_formats=None, **options):
+        super().__init__(column_map, date_formats or self.QIF_DATE_FORMATS, **options)
+
+    @classmethod
+    def sniff(cls, head):
+        return head.lstrip().upper().startswith(b'!TYPE:')
+
+    def iter_rows(self, fileobj):
+        text = io.TextIOWrapper(fileobj, encoding=self.options.get('encoding', 'utf-8-sig'))
+        try:
+            record = {}
+            for line in text:
+                line = line.rstrip('\r\n')
+                if not line or line.startswith('!'):
+                    continue
+                if line.startswith('^'):
+                    row = self._parse_record(record)
+                    record = {}
+                    if row is not None:
+                        yield row
+                else:
+                    record.setdefault(line[0], line[1:])
+        finally:
+            text.detach()
+
+    def _parse_record(self, record):
+        amount = parse_amount(record.get('T') or record.get('U'))
+        if amount is None:
+            return None
+        # Quicken writes two-digit years as 1/15'24
+        raw_date = record.get('D', '').replace("'", '/').replace(' ', '')
+        return self.normalize(raw_date, record.get('P') or record.get('M'), amount=-amount,
+                              category=record.get('L'))
+
+
+def detect_reader(filename, head):
+    '''
+
+    :param filename: original file name, used when the content is not recognisable
+    :param head: first bytes of the file
+    :return: name of the reader for the file, or None if it is not supported
+    '''
+    for name, reader_class in READERS.items():
+        if reader_class.sniff(head):
+            return name
+
+    extension = os.path.splitext(filename or '')[1].lower()
+    for name, reader_class in READERS.items():
+        if extension in reader_class.extensions:
+            return name
+    return None
+
+
+def iter_statement(source, filename=None, reader=None, batch_size=DEFAULT_BATCH_SIZE, **options):
+    '''
+
+    :param source: path of a statement file or a binary file object (e.g. an upload)
+    :param filename: original file name when source is a file object
+    :param reader: force a reader by name instead of auto-detecting it
+    :param batch_size: number of normalized rows per yielded batch
+    :param options: reader options: column_map, date_formats, delimiter, sheet, sheet_delimiter, encoding,
+        keep_columns
+    :return: generator of lists of normalized rows
+    '''
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fileobj:
+            yield from iter_statement(fileobj, filename=filename or os.fspath(source), reader=reader,
+                                      batch_size=batch_size, **options)
+        return
+
+    if reader is None:
+        head = source.read(2048)
+        source.seek(0)
+        reader = detect_reader(filename, head)
+        if reader is None:
+            raise StatementFormatError(f"Unsupported statement file: {filename}")
+    elif reader not in READERS:
+        raise StatementFormatError(f"Unknown statement reader: {reader}")
+
+    yield from READERS[reader](**options).iter_batches(source, batch_size=batch_size)